@@ -1,35 +1,92 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+"""Command line entry point, searches all sites in SearchSites for names."""
 
 import argparse
 import asyncio
 import logging as log
-from itertools import chain
-from typing import Any, Dict, Final, List
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Final, List, Tuple
 
-import tabulate
+import aiohttp
 
-from martyr_search_tool.sites import (
-    airwars,
-    aitnumbers,
-    let_them_grow_up,
-    our_ghaza,
-    twitter
-)
-from martyr_search_tool.sites.base_site import SearchResult
+from martyr_search_tool import sites
+from martyr_search_tool.sites import base_site
+from martyr_search_tool.sites.base_site import BaseSite, SearchResult
+
+__all__ = [
+    "iter_search_names",
+    "main",
+    "parse_args",
+    "print_results",
+    "search_names",
+]
 
 Logger: Final[log.Logger] = log.getLogger(__name__)
 
-SearchSites: List = [
-    airwars.AirWars(),
-    aitnumbers.AintNumbers(),
-    let_them_grow_up.LetThemGrowUp(),
-    our_ghaza.OurGhaza(),
-    twitter.Twitter()
+# Sites to search as (module name, class name) pairs. Site modules are only
+# imported, and sites instantiated, when a search is started.
+SearchSites: Final[List[Tuple[str, str]]] = [
+    ("airwars", "AirWars"),
+    ("aitnumbers", "AintNumbers"),
+    ("let_them_grow_up", "LetThemGrowUp"),
+    ("our_ghaza", "OurGhaza"),
+    ("twitter", "Twitter"),
 ]
 
 
+def create_sites() -> List[BaseSite]:
+    """Import the modules of the sites in SearchSites and instantiate them.
+
+    :return: A list of site instances
+    :rtype: List[BaseSite]
+    """
+    return [
+        getattr(getattr(sites, module_name), class_name)()
+        for module_name, class_name in SearchSites
+    ]
+
+
+def format_table(headers: List[str], rows: List[List[Any]]) -> str:
+    """Format rows of data as a table with a header, with centered cells
+    enclosed in ASCII borders.
+
+    Example:
+    >>> print(format_table(["name", "count"], [["Lian", 3]]))
+    +------+-------+
+    | name | count |
+    +------+-------+
+    | Lian |   3   |
+    +------+-------+
+
+    :param headers: column headers
+    :type headers: List[str]
+    :param rows: table rows, each row has a cell for each column
+    :type rows: List[List[Any]]
+    :return: the formatted table
+    :rtype: str
+    """
+    cells: List[List[str]] = [[str(cell) for cell in row] for row in rows]
+    widths: List[int] = [
+        max(len(cell) for cell in column)
+        for column in zip(headers, *cells)
+    ]
+    border: str = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+
+    def format_row(row: List[str]) -> str:
+        return "| " + " | ".join(
+            f"{cell:^{width}}" for cell, width in zip(row, widths)
+        ) + " |"
+
+    lines: List[str] = [border, format_row(headers), border]
+    lines.extend(format_row(row) for row in cells)
+    lines.append(border)
+    return "\n".join(lines)
+
+
 async def print_results(results: List[SearchResult]) -> None:
     """Prints search results to the console in a table format.
 
@@ -38,17 +95,15 @@ async def print_results(results: List[SearchResult]) -> None:
     :return: None
     """
     table_headers: List[str] = ["name", "count", "url"]
-    table_data: List[List[str]] = []
+    table_data: List[List[Any]] = []
     total_matches: int = 0
     for result in results:
         if result.instances is None:
             continue
-        table_data.append([result.name, len(result.instances), result.url])
-        total_matches += len(result.instances)
-    table: str = tabulate.tabulate(
-        table_data, headers=table_headers, tablefmt="pretty"
-    )
-    print(table)
+        count: int = len(result.instances)
+        table_data.append([result.name, count, result.url])
+        total_matches += count
+    print(format_table(table_headers, table_data))
     print(f"total matches: {total_matches}")
 
 
@@ -72,18 +127,149 @@ async def configure_logging(enable_debug: bool = False) -> None:
     )
 
 
-async def search_names(names: List[str]) -> List[SearchResult]:
-    """Search list of sites in SearchSite for the given names.
+async def configure_executor(
+    processes: int | None = None,
+) -> ProcessPoolExecutor | None:
+    """Create a process pool that fetched pages are searched in (see
+    base_site.set_grep_executor()), if processes is given. Otherwise pages are
+    searched in the event loop's default thread pool.
 
+    Workers are started with the forkserver start method where it's
+    available, otherwise with spawn. Forking the tool's process isn't safe,
+    it runs threads (e.g. the default thread pool) by the time pages are
+    searched. Each page's text is sent to a worker, so the pool only pays off
+    for large pages or many CPUs.
+
+    The event loop's default thread pool is left as is, it's sized for the
+    I/O (e.g. cache reads and writes) that's run in it with to_thread().
+
+    :param processes: number of worker processes, or None to search pages in
+    threads
+    :type processes: int | None
+    :return: the process pool, it should be shut down when the search is
+    done, or None if processes isn't given
+    :rtype: ProcessPoolExecutor | None
+    """
+    if processes is None:
+        return None
+    start_method: str = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+    grep_executor = ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context(start_method),
+    )
+    base_site.set_grep_executor(grep_executor)
+    return grep_executor
+
+
+async def search_site(
+    site: BaseSite,
+    names: List[str],
+    session: aiohttp.ClientSession | None = None,
+) -> List[SearchResult]:
+    """Search a site for the given names, logging the site's failure instead
+    of raising it.
+
+    :param site: the site to search
+    :type site: BaseSite
     :param names: A list of names
     :type names: List[str]
+    :param session: A session shared by all sites that fetch web pages
+    :type session: aiohttp.ClientSession | None
+    :return: A list of SearchResult for the site, or an empty list if the
+    search failed
+    :rtype: List[SearchResult]
+    """
+    try:
+        return await site.search_names(names, session=session)
+    except Exception as exc:
+        Logger.error(f"Searching site: {site.Name} failed: {exc!r}")
+        return []
+
+
+async def iter_search_names(
+    names: List[str], session: aiohttp.ClientSession | None = None
+) -> AsyncIterator[List[SearchResult]]:
+    """Search list of sites in SearchSites for the given names, yielding each
+    site's results as soon as the site's search is done.
+
+    Sites are searched concurrently. If the iteration is stopped early, or
+    cancelled, the searches of the sites that aren't done are cancelled.
+
+    :param names: A list of names, duplicate names are searched once, and
+    empty names are skipped
+    :type names: List[str]
+    :param session: A session used by all sites that fetch web pages, if
+    None, the session returned by base_site.get_session() is used
+    :type session: aiohttp.ClientSession | None
+    :return: An async iterator over the search results of each site, in the
+    order the sites' searches are done. Sites that fail are logged and their
+    results are empty.
+    :rtype: AsyncIterator[List[SearchResult]]
+    """
+    names = list(
+        dict.fromkeys(name.strip() for name in names if name.strip())
+    )
+    search_sites: List[BaseSite] = create_sites()
+    if session is None:
+        session = await base_site.get_session()
+    tasks: List[asyncio.Task] = [
+        asyncio.create_task(search_site(site, names, session))
+        for site in search_sites
+    ]
+    try:
+        for site_results in asyncio.as_completed(tasks):
+            yield await site_results
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def search_names(
+    names: List[str], session: aiohttp.ClientSession | None = None
+) -> List[SearchResult]:
+    """Search list of sites in SearchSites for the given names.
+
+    Sites are searched concurrently (see iter_search_names()), each site's
+    results are added to the list as soon as the site is done.
+
+    :param names: A list of names, duplicate names are searched once
+    :type names: List[str]
+    :param session: A session used by all sites that fetch web pages, if
+    None, the session returned by base_site.get_session() is used
+    :type session: aiohttp.ClientSession | None
     :return: A list of SearchResult that contains the results of the search
-    for each site.
+    for each site. Sites that fail are logged and left out of the results.
     :rtype: List[SearchResult]
     """
-    tasks = [site.search_names(names) for site in SearchSites]
-    search_results: List[List[SearchResult]] = await asyncio.gather(*tasks)
-    return list(chain(*search_results))
+    search_results: List[SearchResult] = []
+    async for site_results in iter_search_names(names, session):
+        search_results.extend(site_results)
+    return search_results
+
+
+def positive_int(value: str) -> int:
+    """Convert a command line argument to a positive integer.
+
+    :param value: the argument's value
+    :type value: str
+    :return: the argument's value as an integer
+    :rtype: int
+    :raises argparse.ArgumentTypeError: if value is not a positive integer
+    """
+    try:
+        number: int = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a positive integer, got: {value}"
+        )
+    return number
 
 
 def configure_parser() -> argparse.ArgumentParser:
@@ -103,6 +289,31 @@ def configure_parser() -> argparse.ArgumentParser:
         action="store",
     )
 
+    parser.add_argument(
+        "-c",
+        "--max-concurrency",
+        type=positive_int,
+        default=base_site.DefaultMaxConcurrency,
+        help="maximum number of requests in flight across all sites "
+        f"(default: {base_site.DefaultMaxConcurrency})",
+    )
+
+    parser.add_argument(
+        "-p",
+        "--grep-processes",
+        type=positive_int,
+        default=None,
+        help="search fetched pages in this many worker processes, instead of "
+        "threads (default: search in threads)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't use or update the cache of fetched pages "
+        f"(default location: {base_site.DefaultCacheDir})",
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -119,7 +330,7 @@ def parse_args(args: List[str]) -> Dict[str, Any]:
 
     Example:
     >>> parse_args(['--verbose', 'Lian Hussein'])
-    {'verbose': True, 'names': ['Lian Hussein']}
+    {'names': ['Lian Hussein'], 'max_concurrency': 32, 'grep_processes': None, 'no_cache': False, 'verbose': True}
 
     :param args: A list of arguments
     :type args: List[str]
@@ -134,11 +345,38 @@ def parse_args(args: List[str]) -> Dict[str, Any]:
 async def main(args: List[str]) -> None:
     args = parse_args(args)
     await configure_logging(args["verbose"])
-    search_results: List[SearchResult] = await search_names(args["names"])
+    grep_executor: ProcessPoolExecutor | None = await configure_executor(
+        args["grep_processes"]
+    )
+    base_site.set_max_concurrency(args["max_concurrency"])
+    if args["no_cache"]:
+        base_site.set_page_cache(None)
+    try:
+        search_results: List[SearchResult] = await search_names(args["names"])
+    finally:
+        await base_site.close_session()
+        if grep_executor is not None:
+            base_site.set_grep_executor(None)
+            grep_executor.shutdown(cancel_futures=True)
     await print_results(search_results)
 
 
-if __name__ == "__main__":
-    import sys
+def event_loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Get the factory used to create the event loop the tool runs in.
 
-    asyncio.run(main(sys.argv[1:]))
+    uvloop's event loop is used if uvloop is installed, otherwise asyncio's
+    default event loop is used.
+
+    :return: uvloop's event loop factory, or None if uvloop isn't installed
+    :rtype: Callable[[], asyncio.AbstractEventLoop] | None
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+if __name__ == "__main__":
+    with asyncio.Runner(loop_factory=event_loop_factory()) as runner:
+        runner.run(main(sys.argv[1:]))
@@ -0,0 +1,26 @@
+"""Sites searched for martyrs' names.
+
+Site modules are imported lazily, on first attribute access, so that modules
+with heavy dependencies (e.g. twitter) are only imported when they're used.
+"""
+
+import importlib
+from types import ModuleType
+from typing import Final, FrozenSet
+
+SiteModules: Final[FrozenSet[str]] = frozenset(
+    {
+        "airwars",
+        "aitnumbers",
+        "base_site",
+        "let_them_grow_up",
+        "our_ghaza",
+        "twitter",
+    }
+)
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in SiteModules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,28 +5,697 @@
 
 import abc
 import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import importlib.util
 import json
 import logging as log
 import pathlib
 import random
 import re
-from collections import namedtuple
-from itertools import chain
-from typing import Dict, Final, List
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Final,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Set,
+    Tuple,
+)
 from urllib import parse
 
 import aiohttp
-from anyio import open_file
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 Logger: Final[log.Logger] = log.getLogger(__name__)
 AgentsFile: Final[pathlib.Path] = pathlib.Path(__file__).parent / "agents.json"
-FetchResult = namedtuple("FetchResult", ["url", "status", "html"])
 
 
+def json_loads(data: bytes) -> Any:
+    """Deserialize utf-8 encoded JSON, with orjson if it's installed.
+
+    :param data: the JSON document
+    :type data: bytes
+    :return: the deserialized object
+    :rtype: Any
+    :raises ValueError: if data isn't valid JSON
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize an object to utf-8 encoded JSON, with orjson if it's
+    installed.
+
+    :param obj: the object to serialize
+    :type obj: Any
+    :return: the JSON document
+    :rtype: bytes
+    """
+    if orjson is None:
+        return json.dumps(obj).encode("utf-8")
+    return orjson.dumps(obj)
+
+
+# User agents to choose from when creating a session, loaded once at import
+UserAgents: Final[Tuple[str, ...]] = tuple(
+    agent["ua"] for agent in json_loads(AgentsFile.read_bytes())
+)
+
+
+class FetchResult(NamedTuple):
+    """The result of fetching a web page.
+
+    Attributes:
+        - url: The url of the page
+        - status: The response's status code
+        - html: The page's content, or None if the page couldn't be fetched
+        - text: The page's body text if it was extracted while downloading
+        the page (see PageTextTarget), otherwise None
+    """
+
+    url: str
+    status: int
+    html: str | None
+    text: str | None = None
+
+
+# Maximum number of compiled name patterns kept in cache
+PatternCacheSize: Final[int] = 4096
+
+# Hyperscan scratch spaces of each thread (see hyperscan_scratch())
+HyperscanScratches: Final[threading.local] = threading.local()
+
+# Maximum number of Hyperscan scratch spaces kept by each thread
+ScratchCacheSize: Final[int] = 64
+
+# Turkish i's that re.IGNORECASE matches with "i", but str.casefold() doesn't
+TurkishIs: Final[Dict[int, str]] = str.maketrans(
+    {"\u0130": "i", "\u0131": "i"}
+)
+
+# Elements whose text isn't part of a page's visible text
+NonTextElements: Final[Tuple[str, ...]] = ("script", "style", "template")
+
+# Makes BeautifulSoup build only the body of a page, skipping its head
+BodyStrainer: Final[SoupStrainer] = SoupStrainer("body")
+
+# Content encodings requested from sites, brotli is only requested if a
+# brotli decoder is installed, since aiohttp can't decode it otherwise
+AcceptEncoding: Final[str] = ", ".join(
+    ["gzip", "deflate"]
+    + (
+        ["br"]
+        if importlib.util.find_spec("brotli")
+        or importlib.util.find_spec("brotlicffi")
+        else []
+    )
+)
+
+# Response statuses of requests that are retried
+RetryStatuses: Final[FrozenSet[int]] = frozenset({429, 500, 502, 503, 504})
+
+# Maximum delay, in seconds, before retrying a request
+MaxRetryDelay: Final[float] = 30.0
+
+
+def retry_after(response: aiohttp.ClientResponse) -> float | None:
+    """Get the delay requested by a response's Retry-After header.
+
+    :param response: the response
+    :type response: aiohttp.ClientResponse
+    :return: the delay in seconds, capped at MaxRetryDelay, or None if the
+    header is missing or isn't a number of seconds
+    :rtype: float | None
+    """
+    try:
+        delay: float = float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+    return min(max(delay, 0.0), MaxRetryDelay)
+
+
+def page_url_template(template: str, **fields: str) -> Callable[[int], str]:
+    """Create a function that builds the url of a page from a url template.
+
+    The template is formatted once with the other fields, and split around
+    its {page} placeholder, so each page's url is built by concatenating the
+    page's index between the two parts instead of formatting the template.
+
+    :param template: a url template that contains the {page} placeholder
+    :type template: str
+    :param fields: values of the template's other placeholders
+    :type fields: str
+    :return: A function that returns the url of a page given its index
+    :rtype: Callable[[int], str]
+    """
+    prefix, suffix = template.format(page="{page}", **fields).split(
+        "{page}", 1
+    )
+    return lambda page: prefix + str(page) + suffix
+
+
+# Default directory of the cache of fetched pages
+DefaultCacheDir: Final[pathlib.Path] = (
+    pathlib.Path.home() / ".cache" / "martyr_search_tool"
+)
+
+# Default time, in seconds, that a cached page is kept (a week)
+DefaultCacheMaxAge: Final[float] = 7 * 24 * 60 * 60
+
+# Default maximum number of pages kept in the cache of fetched pages
+DefaultCacheMaxEntries: Final[int] = 2048
+
+# Default maximum number of requests in flight across all sites
+DefaultMaxConcurrency: Final[int] = 32
+
+# Maximum number of requests in flight across all sites
+MaxConcurrency: int = DefaultMaxConcurrency
+
+# Limits the number of requests in flight across all sites, created for each
+# event loop, see requests_semaphore()
+RequestsSemaphore: asyncio.Semaphore | None = None
+
+
+def set_max_concurrency(limit: int) -> None:
+    """Set the maximum number of requests in flight across all sites.
+
+    :param limit: maximum number of concurrent requests, must be positive
+    :type limit: int
+    :return: None
+    """
+    global MaxConcurrency, RequestsSemaphore
+    MaxConcurrency = limit
+    RequestsSemaphore = None
+
+
+def requests_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore that limits the number of requests in flight across
+    all sites in the running event loop (see bind_running_loop()).
+
+    :return: The semaphore
+    :rtype: asyncio.Semaphore
+    """
+    global RequestsSemaphore
+    bind_running_loop()
+    if RequestsSemaphore is None:
+        RequestsSemaphore = asyncio.Semaphore(MaxConcurrency)
+    return RequestsSemaphore
+
+
+# Executor that fetched pages are searched in, if None, pages are searched in
+# the event loop's default executor
+GrepExecutor: concurrent.futures.Executor | None = None
+
+
+def set_grep_executor(executor: concurrent.futures.Executor | None) -> None:
+    """Set the executor that fetched pages are searched in by all sites.
+
+    Searching pages is CPU bound, a ProcessPoolExecutor searches multiple
+    pages in parallel on multiple cores.
+
+    :param executor: the executor to use, or None to use the event loop's
+    default executor
+    :type executor: concurrent.futures.Executor | None
+    :return: None
+    """
+    global GrepExecutor
+    GrepExecutor = executor
+
+
+@functools.lru_cache(maxsize=32)
+def page_text(html: str) -> str:
+    """Extract the text of a page's body.
+
+    If lxml is installed, the page is parsed with PageTextTarget, the same
+    parser target that extracts the text of pages while they're downloaded
+    (see StaticFetch.read_body()), so a page's text is the same whether it
+    was downloaded or taken from a cache. Otherwise, the page is parsed with
+    BeautifulSoup's html.parser, which builds only the page's body. Text of
+    scripts, styles and templates is left out. If the page has no body, the
+    text of the whole page is returned.
+
+    The text of recently searched pages is cached, so a page that's searched
+    for multiple names (e.g. by SinglePageSite.search_name()) is parsed once.
+
+    :param html: the html of the page
+    :type html: str
+    :return: the text of the page's body
+    :rtype: str
+    """
+    if lxml_etree is None:
+        parsed_html = BeautifulSoup(
+            html, "html.parser", parse_only=BodyStrainer
+        )
+        if parsed_html.body is None:
+            # the page has no body, its text is the text of the whole page
+            parsed_html = BeautifulSoup(html, "html.parser")
+        for element in parsed_html.find_all(NonTextElements):
+            element.decompose()
+        return (parsed_html.body or parsed_html).text
+
+    parser = lxml_etree.HTMLParser(target=PageTextTarget())
+    try:
+        parser.feed(html)
+        return parser.close()
+    except lxml_etree.XMLSyntaxError:
+        return ""
+
+
+class PageTextTarget:
+    """An lxml parser target that collects the text of a page's body.
+
+    It's fed the page while the page is downloaded, so the page is parsed
+    as it arrives and no element tree is built. Text nodes are kept only
+    until they're joined, and the text before the body is dropped as soon
+    as the body starts. Text after the body's end is left out.
+    """
+
+    def __init__(self) -> None:
+        self.text: List[str] = []
+        self.has_body: bool = False
+        # number of text nodes collected when the body last ended
+        self.body_end: int | None = None
+        self.skipped_depth: int = 0
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self.skipped_depth or tag in NonTextElements:
+            self.skipped_depth += 1
+        elif tag == "body" and not self.has_body:
+            # the page has a body, the text before it isn't needed
+            self.text.clear()
+            self.has_body = True
+
+    def end(self, tag: str) -> None:
+        if self.skipped_depth:
+            self.skipped_depth -= 1
+        elif tag == "body" and self.has_body:
+            self.body_end = len(self.text)
+
+    def data(self, data: str) -> None:
+        if not self.skipped_depth:
+            self.text.append(data)
+
+    def close(self) -> str:
+        text: str = "".join(islice(self.text, self.body_end))
+        self.text.clear()
+        return text
+
+
+def fold_case(text: str) -> str:
+    """Fold the case of a text, for case-insensitive substring checks.
+
+    The text is case folded, and the Turkish dotted and dotless i are folded
+    to "i", since re.IGNORECASE matches them with "i". So if name_pattern()
+    matches a name in a line, the folded name is in the folded line.
+
+    :param text: the text to fold
+    :type text: str
+    :return: the folded text
+    :rtype: str
+    """
+    return text.translate(TurkishIs).casefold()
+
+
+@functools.lru_cache(maxsize=PatternCacheSize)
+def name_pattern(name: str) -> re.Pattern:
+    """Compile a case-insensitive regex that matches a name as whole words.
+
+    Compiled patterns are cached, so a name is compiled once and reused for
+    every page and site it's searched in.
+
+    :param name: the name to match
+    :type name: str
+    :return: A compiled regex pattern
+    :rtype: re.Pattern
+    """
+    return re.compile(f"\\b{re.escape(name)}\\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=PatternCacheSize)
+def names_pattern(names: Tuple[str, ...]) -> re.Pattern:
+    """Compile a case-insensitive regex that matches any of the names as whole
+    words.
+
+    A single name reuses the pattern compiled by name_pattern(), so
+    searching a page for one name compiles one pattern.
+
+    :param names: the names to match
+    :type names: Tuple[str, ...]
+    :return: A compiled regex pattern
+    :rtype: re.Pattern
+    """
+    if len(names) == 1:
+        return name_pattern(names[0])
+
+    alternatives: str = "|".join(re.escape(name) for name in names)
+    return re.compile(f"\\b(?:{alternatives})\\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=64)
+def names_checks(
+    names: Tuple[str, ...]
+) -> Dict[str, Tuple[str, re.Pattern]]:
+    """Get the case folded form (see fold_case()) and the pattern (see
+    name_pattern()) of each name, that lines are checked with.
+
+    The checks are cached, so texts searched for the same names (e.g. many
+    tweets) don't fold and look up each name's pattern again.
+
+    :param names: the names to check for
+    :type names: Tuple[str, ...]
+    :return: A dictionary that maps each name to its folded form and pattern
+    :rtype: Dict[str, Tuple[str, re.Pattern]]
+    """
+    return {name: (fold_case(name), name_pattern(name)) for name in names}
+
+
+def hyperscan_expression(name: str) -> bytes:
+    """Convert a name to a Hyperscan expression that matches the name
+    wherever name_pattern() would.
+
+    Hyperscan's unicode case folding doesn't cover all the characters that
+    re.IGNORECASE matches (e.g. the Turkish i's), so each cased character
+    is matched with a class of its case variants that re.IGNORECASE matches
+    it with. A few archaic letter forms that re.IGNORECASE also matches
+    (e.g. U+1C80 for the Cyrillic "в") aren't case variants of the letter,
+    and aren't matched.
+
+    :param name: the name to convert
+    :type name: str
+    :return: the utf-8 encoded expression
+    :rtype: bytes
+    """
+    expression: List[str] = []
+    for char in name:
+        pattern: re.Pattern = re.compile(re.escape(char), re.IGNORECASE)
+        variants: List[str] = sorted(
+            {
+                variant
+                for variant in (
+                    char,
+                    char.lower(),
+                    char.upper(),
+                    char.title(),
+                    char.casefold(),
+                    *TurkishIs.values(),
+                    *map(chr, TurkishIs),
+                )
+                if len(variant) == 1 and pattern.fullmatch(variant)
+            }
+        )
+        if len(variants) == 1:
+            expression.append(re.escape(char))
+        else:
+            expression.append(f"[{''.join(map(re.escape, variants))}]")
+    return "".join(expression).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=64)
+def names_database(names: Tuple[str, ...]) -> "hyperscan.Database":
+    """Compile a Hyperscan database that matches any of the names,
+    case-insensitively (see hyperscan_expression()).
+
+    Hyperscan doesn't support word boundaries in unicode mode, so the names
+    are matched anywhere, not only as whole words.
+
+    :param names: the names to match
+    :type names: Tuple[str, ...]
+    :return: A compiled Hyperscan block mode database
+    :rtype: hyperscan.Database
+    """
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[hyperscan_expression(name) for name in names],
+        ids=list(range(len(names))),
+        elements=len(names),
+        flags=hyperscan.HS_FLAG_CASELESS
+        | hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_UCP,
+    )
+    return database
+
+
+def candidate_lines(
+    text: str, names: Tuple[str, ...]
+) -> Iterator[Tuple[str, Collection[str]]]:
+    """Get the lines of a text that may contain any of the names, with the
+    names each line may contain.
+
+    The text is scanned once for all names, with Hyperscan if it's
+    installed, otherwise with an Aho-Corasick automaton if pyahocorasick is
+    installed, otherwise with names_pattern(). Each line is returned once,
+    in the order of the text. Hyperscan and the automaton report which
+    names they found in a line, names_pattern() stops at the first name it
+    finds, so its lines are returned with all the names. Matches aren't
+    limited to whole words, so lines must still be checked for each name.
+    Empty and whitespace-only names are skipped, they can't be found.
+
+    :param text: the text to scan
+    :type text: str
+    :param names: the names to scan for
+    :type names: Tuple[str, ...]
+    :return: An iterator over the candidate lines and their names
+    :rtype: Iterator[Tuple[str, Collection[str]]]
+    """
+    names = tuple(name for name in names if name.strip())
+    if not names:
+        return
+
+    if hyperscan is not None:
+        yield from hyperscan_candidate_lines(text, names)
+        return
+
+    if ahocorasick is not None:
+        yield from automaton_candidate_lines(text, names)
+        return
+
+    line_end: int = -1
+    for match in names_pattern(names).finditer(text):
+        if match.start() < line_end:
+            # the match is in a line that was already returned
+            continue
+        line_start: int = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        if line_end == -1:
+            line_end = len(text)
+        yield text[line_start:line_end], names
+
+
+@functools.lru_cache(maxsize=64)
+def names_automaton(names: Tuple[str, ...]) -> "ahocorasick.Automaton":
+    """Build an Aho-Corasick automaton that matches any of the case folded
+    names (see fold_case()). Each match's value is a tuple of the names
+    that fold to the matched text.
+
+    :param names: the names to match
+    :type names: Tuple[str, ...]
+    :return: the automaton
+    :rtype: ahocorasick.Automaton
+    """
+    folded_names: Dict[str, Tuple[str, ...]] = {}
+    for name in names:
+        folded_name: str = fold_case(name)
+        folded_names[folded_name] = folded_names.get(folded_name, ()) + (name,)
+    automaton = ahocorasick.Automaton()
+    for folded_name, same_names in folded_names.items():
+        automaton.add_word(folded_name, same_names)
+    automaton.make_automaton()
+    return automaton
+
+
+def automaton_candidate_lines(
+    text: str, names: Tuple[str, ...]
+) -> Iterator[Tuple[str, Collection[str]]]:
+    """Get the lines of a text that contain any of the names, with the names
+    each line contains, using an Aho-Corasick automaton. See
+    candidate_lines().
+
+    :param text: the text to scan
+    :type text: str
+    :param names: the names to scan for
+    :type names: Tuple[str, ...]
+    :return: An iterator over the candidate lines and their names
+    :rtype: Iterator[Tuple[str, Collection[str]]]
+    """
+    automaton = names_automaton(names)
+    folded_text: str = fold_case(text)
+    if len(folded_text) != len(text):
+        # case folding expanded some characters (e.g. "ß" to "ss"), so
+        # offsets in the folded text don't match the text's
+        yield from unaligned_candidate_lines(
+            text, folded_text, automaton.iter(folded_text)
+        )
+        return
+
+    line_start: int = 0
+    line_end: int = -1
+    line_names: Set[str] = set()
+    for match_end, same_names in automaton.iter(folded_text):
+        if match_end > line_end:
+            if line_names:
+                yield text[line_start:line_end], line_names
+                line_names = set()
+            line_start = text.rfind("\n", 0, match_end) + 1
+            line_end = text.find("\n", match_end)
+            if line_end == -1:
+                line_end = len(text)
+        line_names.update(same_names)
+    if line_names:
+        yield text[line_start:line_end], line_names
+
+
+def unaligned_candidate_lines(
+    text: str,
+    folded_text: str,
+    matches: Iterator[Tuple[int, Tuple[str, ...]]],
+) -> Iterator[Tuple[str, Collection[str]]]:
+    """Get the lines of a text that contain matches found in its case folded
+    text, when case folding changed the text's length.
+
+    Case folding never adds or removes line breaks, so the n-th line of the
+    folded text is the n-th line of the text. Both texts are walked line by
+    line up to each match, and the text's line is sliced out.
+
+    :param text: the text
+    :type text: str
+    :param folded_text: the case folded text (see fold_case())
+    :type folded_text: str
+    :param matches: the end offsets (inclusive) of the matches in the
+    folded text, in ascending order, each paired with the matched names
+    :type matches: Iterator[Tuple[int, Tuple[str, ...]]]
+    :return: An iterator over the lines that contain a match and their names
+    :rtype: Iterator[Tuple[str, Collection[str]]]
+    """
+    folded_line_end: int = -1
+    line_start: int = 0
+    line_end: int = -1
+    line_names: Set[str] = set()
+    for match_end, same_names in matches:
+        if match_end > folded_line_end and line_names:
+            yield text[line_start:line_end], line_names
+            line_names = set()
+        while folded_line_end < match_end:
+            folded_line_end = folded_text.find("\n", folded_line_end + 1)
+            if folded_line_end == -1:
+                folded_line_end = len(folded_text)
+            line_start = line_end + 1
+            line_end = text.find("\n", line_start)
+            if line_end == -1:
+                line_end = len(text)
+        line_names.update(same_names)
+    if line_names:
+        yield text[line_start:line_end], line_names
+
+
+def hyperscan_candidate_lines(
+    text: str, names: Tuple[str, ...]
+) -> Iterator[Tuple[str, Collection[str]]]:
+    """Get the lines of a text that contain any of the names, with the names
+    each line contains, using Hyperscan. See candidate_lines().
+
+    :param text: the text to scan
+    :type text: str
+    :param names: the names to scan for
+    :type names: Tuple[str, ...]
+    :return: An iterator over the candidate lines and their names
+    :rtype: Iterator[Tuple[str, Collection[str]]]
+    """
+    data: bytes = text.encode("utf-8", errors="surrogatepass")
+    database = names_database(names)
+    matches: List[Tuple[int, int]] = []
+    database.scan(
+        data,
+        match_event_handler=lambda name_id, _start, end, _flags, _context: (
+            matches.append((end, name_id))
+        ),
+        scratch=hyperscan_scratch(database),
+    )
+    line_start: int = 0
+    line_end: int = -1
+    line_names: Set[str] = set()
+    for match_end, name_id in sorted(matches):
+        if match_end > line_end:
+            if line_names:
+                yield decode_line(data[line_start:line_end]), line_names
+                line_names = set()
+            line_start = data.rfind(b"\n", 0, match_end) + 1
+            line_end = data.find(b"\n", match_end)
+            if line_end == -1:
+                line_end = len(data)
+        line_names.add(names[name_id])
+    if line_names:
+        yield decode_line(data[line_start:line_end]), line_names
+
+
+def hyperscan_scratch(database: "hyperscan.Database") -> "hyperscan.Scratch":
+    """Get the calling thread's scratch space for scanning with a database.
+
+    A scratch space can't be used by two scans at once, so each thread gets
+    its own, and reuses it for every scan with the same database. Allocating
+    a scratch space costs more than scanning a short text (e.g. a tweet).
+
+    :param database: the database to scan with
+    :type database: hyperscan.Database
+    :return: the thread's scratch space for the database
+    :rtype: hyperscan.Scratch
+    """
+    scratches: Dict[Any, Any] | None = getattr(
+        HyperscanScratches, "scratches", None
+    )
+    if scratches is None or len(scratches) >= ScratchCacheSize:
+        scratches = HyperscanScratches.scratches = {}
+    scratch = scratches.get(database)
+    if scratch is None:
+        scratch = scratches[database] = hyperscan.Scratch(database)
+    return scratch
+
+
+def decode_line(line: bytes) -> str:
+    """Decode a line sliced out of a text encoded by
+    hyperscan_candidate_lines()."""
+    return line.decode("utf-8", errors="surrogatepass")
+
+
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """A Wrapper class for search results.
 
+    Search results are immutable. The instances list isn't copied, callers
+    must not modify a list after passing it to a search result.
+
     Attributes:
         - url: The url of the search result
         - name: The name used in the search query
@@ -34,13 +703,16 @@ class SearchResult:
 
     Methods:
         - to_dict: Convert search result instance into a nested dictionary
-        - from_dict: Update search result instance from a dictionary
+        - from_dict: Create a search result instance from a dictionary
     """
 
-    def __init__(self, url: str, name: str, instances: List[str] | None):
-        self.url: str = url
-        self.name: str = name
-        self.instances: List[str] | None = instances[:] if instances else None
+    url: str
+    name: str
+    instances: List[str] | None
+
+    def __post_init__(self) -> None:
+        if not self.instances:
+            object.__setattr__(self, "instances", None)
 
     def to_dict(self) -> Dict[str, Dict[str, List[str]]]:
         """Convert search result instance into a nested dictionary.
@@ -52,14 +724,13 @@ class SearchResult:
             "query url": ["name instance 1", "name instance 2"]
         }
         """
-        return {
-            self.name: {
-                self.url: self.instances[:] if self.instances else None
-            }
-        }
+        return {self.name: {self.url: self.instances}}
 
-    def from_dict(self, data: Dict[str, Dict[str, List[str]]]) -> None:
-        """Update search result instance from a dictionary.
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Dict[str, List[str]]]
+    ) -> "SearchResult":
+        """Create a search result instance from a dictionary.
 
         :param data: A dictionary that contains the name as a key, and a nested
         dictionary that contains the search query as a key, and a list of
@@ -68,15 +739,284 @@ class SearchResult:
             "query url": ["name instance 1", "name instance 2"]
         }
         :type data: Dict[str, Dict[str, List[str]]]
+        :return: A new search result instance
+        :rtype: SearchResult
         """
-        self.name = list(data.keys())[0]
-        self.url = list(data[self.name].keys())[0]
-        self.instances = data[self.name][self.url][:]
+        name: str = next(iter(data))
+        url: str = next(iter(data[name]))
+        return cls(url, name, data[name][url])
 
     def __str__(self):
         return f"{self.url}:{self.name}:{self.instances}"
 
 
+class ResponseCache:
+    """An on-disk cache of fetched pages.
+
+    Pages are stored with their ETag and Last-Modified headers, and are
+    revalidated with conditional requests (If-None-Match, If-Modified-Since)
+    the next time they're fetched. If the page didn't change, the server
+    responds with 304 Not Modified, and the cached page is used instead of
+    downloading it again. Pages without validators aren't cached.
+
+    Pages older than max_age are downloaded again. The first time a page is
+    stored, expired pages are removed from the directory, and the oldest
+    pages are removed if there are more than max_entries.
+
+    Attributes:
+        - directory: The directory where cached pages are stored
+        - max_age: Time, in seconds, that a cached page is used
+        - max_entries: Maximum number of pages kept in the directory
+
+    Methods:
+        - load: Load a cached page
+        - store: Store a fetched page in the cache
+        - prune: Remove expired pages, and the oldest pages over max_entries
+        - conditional_headers: Get the headers to revalidate a cached page
+    """
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        max_age: float = DefaultCacheMaxAge,
+        max_entries: int = DefaultCacheMaxEntries,
+    ):
+        self.directory: pathlib.Path = directory
+        self.max_age: float = max_age
+        self.max_entries: int = max_entries
+        self.pruned: bool = False
+
+    def entry_path(self, url: str) -> pathlib.Path:
+        """Get the path of the file that caches a page."""
+        key: str = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json"
+
+    async def load(self, url: str) -> Dict[str, Any] | None:
+        """Load a cached page.
+
+        :param url: url of the page
+        :type url: str
+        :return: A dictionary that contains the page's url, validators and
+        html, or None if the page isn't cached
+        :rtype: Dict[str, Any] | None
+        """
+        try:
+            data: bytes | None = await asyncio.to_thread(
+                self.read_entry, self.entry_path(url)
+            )
+            if data is None:
+                return None
+            entry: Dict[str, Any] = json_loads(data)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def read_entry(self, path: pathlib.Path) -> bytes | None:
+        """Read a cached page's file, or remove it if it expired.
+
+        :param path: path of the page's file
+        :type path: pathlib.Path
+        :return: the file's content, or None if the page expired
+        :rtype: bytes | None
+        """
+        if time.time() - path.stat().st_mtime > self.max_age:
+            path.unlink(missing_ok=True)
+            return None
+        return path.read_bytes()
+
+    async def store(
+        self, url: str, response: aiohttp.ClientResponse, html: str
+    ) -> None:
+        """Store a fetched page in the cache, if the response has validators.
+
+        :param url: url of the page
+        :type url: str
+        :param response: the response the page was fetched with
+        :type response: aiohttp.ClientResponse
+        :param html: the page's content
+        :type html: str
+        :return: None
+        """
+        etag: str | None = response.headers.get("ETag")
+        last_modified: str | None = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return
+
+        entry: Dict[str, Any] = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "html": html,
+        }
+        prune: bool = not self.pruned
+        self.pruned = True
+        try:
+            await asyncio.to_thread(
+                self.write_entry,
+                self.entry_path(url),
+                json_dumps(entry),
+                prune,
+            )
+        except OSError as os_err:
+            Logger.warning(f"Failed to cache page: {url}, error: {os_err}")
+
+    def write_entry(
+        self, path: pathlib.Path, data: bytes, prune: bool
+    ) -> None:
+        """Write a cached page's file, creating the cache's directory if
+        needed.
+
+        :param path: path of the page's file
+        :type path: pathlib.Path
+        :param data: the file's content
+        :type data: bytes
+        :param prune: prune the cache (see prune()) before writing the file
+        :type prune: bool
+        :return: None
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if prune:
+            self.prune()
+        path.write_bytes(data)
+
+    def prune(self) -> None:
+        """Remove the pages that expired, then the oldest pages until at most
+        max_entries pages are left. Files that can't be removed are skipped.
+
+        :return: None
+        """
+        entries: List[Tuple[float, pathlib.Path]] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        oldest: float = time.time() - self.max_age
+        for index, (modified, path) in enumerate(entries):
+            if index >= self.max_entries or modified < oldest:
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any] | None) -> Dict[str, str]:
+        """Get the headers used to revalidate a cached page.
+
+        :param entry: a cached page, as returned by load()
+        :type entry: Dict[str, Any] | None
+        :return: If-None-Match and/or If-Modified-Since headers
+        :rtype: Dict[str, str]
+        """
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+
+class RecentPages:
+    """An in-memory cache of recently fetched pages, shared by all sites.
+
+    It holds up to a maximum number of pages, the least recently used page
+    is dropped when it's full, and pages expire after a time to live.
+
+    Attributes:
+        - max_size: The maximum number of pages in the cache
+        - ttl: The time, in seconds, a page stays in the cache
+
+    Methods:
+        - get: Get a page from the cache
+        - put: Add a page to the cache
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.pages: OrderedDict[str, Tuple[float, FetchResult]] = OrderedDict()
+
+    def get(self, url: str) -> FetchResult | None:
+        """Get a page from the cache.
+
+        :param url: url of the page
+        :type url: str
+        :return: the page, or None if it isn't cached or has expired
+        :rtype: FetchResult | None
+        """
+        cached: Tuple[float, FetchResult] | None = self.pages.get(url)
+        if cached is None:
+            return None
+        expires, page = cached
+        if expires < time.monotonic():
+            del self.pages[url]
+            return None
+        self.pages.move_to_end(url)
+        return page
+
+    def put(self, page: FetchResult) -> None:
+        """Add a page to the cache, dropping the least recently used page if
+        the cache is full.
+
+        :param page: the page
+        :type page: FetchResult
+        :return: None
+        """
+        self.pages[page.url] = (time.monotonic() + self.ttl, page)
+        self.pages.move_to_end(page.url)
+        while len(self.pages) > self.max_size:
+            self.pages.popitem(last=False)
+
+
+# Cache of fetched pages used across runs, None disables caching
+PageCache: ResponseCache | None = ResponseCache(DefaultCacheDir)
+
+# Pages fetched recently by any site, so sites that fetch the same url don't
+# request it again
+RecentPagesCache: RecentPages = RecentPages(max_size=256, ttl=600.0)
+
+
+# Session shared by all sites, see get_session()
+SharedSession: aiohttp.ClientSession | None = None
+SharedSessionLock: asyncio.Lock | None = None
+
+# The event loop that RequestsSemaphore, SharedSession and SharedSessionLock
+# belong to, see bind_running_loop()
+SharedLoop: asyncio.AbstractEventLoop | None = None
+
+
+def bind_running_loop() -> None:
+    """Bind the asyncio objects shared by all sites to the running event loop.
+
+    The requests semaphore, the shared session and its lock can only be used
+    in the event loop they were first used in. If the running loop is
+    another loop (e.g. search_names() is run by a second asyncio.run()
+    call), they're dropped, and created again in the running loop when
+    they're needed. A session of another loop can't be closed from the
+    running loop, so it's left to be garbage collected.
+
+    :return: None
+    """
+    global SharedLoop, RequestsSemaphore, SharedSession, SharedSessionLock
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    if loop is not SharedLoop:
+        SharedLoop = loop
+        RequestsSemaphore = None
+        SharedSession = None
+        SharedSessionLock = asyncio.Lock()
+
+
+def set_page_cache(cache: ResponseCache | None) -> None:
+    """Set the cache of fetched pages used by all sites.
+
+    :param cache: the cache to use, or None to disable caching
+    :type cache: ResponseCache | None
+    :return: None
+    """
+    global PageCache
+    PageCache = cache
+
+
 class BaseFetch(abc.ABC):
     """An abstract base class for fetching web pages.
 
@@ -108,27 +1048,138 @@ class BaseFetch(abc.ABC):
 
 
 class StaticFetch(BaseFetch):
-    """A class that fetches web pages from a static site."""
+    """A class that fetches web pages from a static site.
 
-    async def fetch_setup(self, *args, **kwargs):
-        """Create a new aiohttp.ClientSession and set the User-Agent header."""
-        async with await open_file(AgentsFile) as f:
-            contents: str = await f.read()
-        agents: List[Dict[str, str]] = json.loads(contents)
-        self.user_agent: str = random.choice(agents)["ua"]
-        self.headers: Dict[str, str] = {"User-Agent": self.user_agent}
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession(
-            headers=self.headers
+    Class Attributes:
+        - FirstPageWindow: The number of pages fetched concurrently by
+        fetch_pages() when it starts
+        - MaxPageWindow: The maximum number of pages fetched concurrently by
+        fetch_pages()
+        - ProbeLastPage: If True, fetch_pages() finds the last page with HEAD
+        requests before fetching all pages at once, instead of fetching pages
+        in a sliding window. Suits sites with many pages.
+        - ProbesPerRound: The number of HEAD requests sent concurrently in
+        each round of exponential probing for the last page
+        - MaxPages: The maximum number of pages fetched by fetch_pages(), pages
+        after it are neither probed nor fetched
+        - MaxRetries: The maximum number of times a failed request is retried
+        - RetryBackoff: The delay, in seconds, before the first retry of a
+        failed request, the delay doubles with each retry
+        - ConnectionLimit: The maximum number of simultaneous connections in
+        the session's connection pool
+        - ConnectionLimitPerHost: The maximum number of simultaneous
+        connections to the same host
+        - DnsCacheTTL: The time, in seconds, resolved host addresses are cached
+        - KeepAliveTimeout: The time, in seconds, idle connections are kept
+        open in the pool
+        - MaxPageSize: The maximum number of bytes read from a page's body,
+        the rest of the body is discarded
+        - ChunkSize: The size of the chunks a page's body is read in
+    """
+
+    FirstPageWindow: int = 1
+    MaxPageWindow: int = 16
+    ProbeLastPage: bool = False
+    ProbesPerRound: int = 4
+    MaxPages: int = 4096
+    MaxRetries: int = 3
+    RetryBackoff: float = 0.5
+    ConnectionLimit: int = 200
+    ConnectionLimitPerHost: int = 20
+    DnsCacheTTL: int = 600
+    KeepAliveTimeout: float = 75
+    MaxPageSize: int = 8 * 1024 * 1024
+    ChunkSize: int = 16 * 1024
+
+    @classmethod
+    async def create_session(cls) -> aiohttp.ClientSession:
+        """Create a new aiohttp.ClientSession with a random User-Agent header,
+        that requests compressed responses.
+
+        The session uses a keep-alive connection pool, so connections (and
+        their TLS handshakes) are reused across requests to the same host.
+        Sites share a single session by default, see get_session().
+
+        :return: A new session, the caller is responsible for closing it
+        :rtype: aiohttp.ClientSession
+        """
+        user_agent: str = random.choice(UserAgents)
+        headers: Dict[str, str] = {
+            "User-Agent": user_agent,
+            "Accept-Encoding": AcceptEncoding,
+        }
+        connector: aiohttp.TCPConnector = aiohttp.TCPConnector(
+            limit=cls.ConnectionLimit,
+            limit_per_host=cls.ConnectionLimitPerHost,
+            ttl_dns_cache=cls.DnsCacheTTL,
+            keepalive_timeout=cls.KeepAliveTimeout,
+        )
+        Logger.debug(f"Using headers: {user_agent}")
+        return aiohttp.ClientSession(headers=headers, connector=connector)
+
+    async def fetch_setup(
+        self, *args, session: aiohttp.ClientSession | None = None, **kwargs
+    ):
+        """Set the aiohttp.ClientSession used to fetch pages.
+
+        :param session: A session to use instead of the session shared by all
+        sites (see get_session())
+        :type session: aiohttp.ClientSession | None
+        """
+        self.session: aiohttp.ClientSession = (
+            await get_session() if session is None else session
         )
-        Logger.debug(f"Using headers: {self.user_agent}")
+        self.requests: Dict[str, asyncio.Task] = {}
 
     async def fetch_teardown(self, *args, **kwargs):
-        """Close the aiohttp.ClientSession session."""
-        await self.session.close()
+        """Forget the requests made since fetch_setup(). The session isn't
+        closed, since it's shared with other sites."""
+        self.requests = {}
 
     async def fetch_page(self, page_url: str, **kwargs) -> FetchResult:
         """Get the contents of a web page
 
+        A page is requested once between fetch_setup() and fetch_teardown(),
+        concurrent and later calls for the same url share the same request.
+        Pages that were fetched recently by any site are taken from
+        RecentPagesCache instead of being requested again.
+
+        :param page_url: url of the page
+        :type page_url: str
+        :return: A FetchResult instance that contains the url, the status code
+        and the page's content.
+        :rtype: FetchResult
+        """
+        if page_url not in self.requests:
+            recent_page: FetchResult | None = RecentPagesCache.get(page_url)
+            if recent_page is not None:
+                return recent_page
+            self.requests[page_url] = asyncio.create_task(
+                self.request_page(page_url)
+            )
+        return await asyncio.shield(self.requests[page_url])
+
+    def cancel_page(self, page_url: str) -> None:
+        """Cancel the request of a page started by fetch_page(), if it's still
+        in flight. A later fetch_page() call for the page requests it again.
+
+        :param page_url: url of the page
+        :type page_url: str
+        :return: None
+        """
+        request: asyncio.Task | None = self.requests.pop(page_url, None)
+        if request is not None and not request.done():
+            request.cancel()
+
+    async def request_page(self, page_url: str) -> FetchResult:
+        """Request a web page from the site.
+
+        Pages in PageCache are revalidated instead of being downloaded again.
+        Pages truncated at MaxPageSize (see read_body()) aren't cached.
+        Requests that fail with a connection error, a timeout, or a status in
+        RetryStatuses are retried up to MaxRetries times, with an exponential
+        backoff, or after the delay in the response's Retry-After header.
+
         :param page_url: url of the page
         :type page_url: str
         :return: A FetchResult instance that contains the url, the status code
@@ -136,15 +1187,376 @@ class StaticFetch(BaseFetch):
         :rtype: FetchResult
         """
         Logger.debug(f"Fetching page: {page_url}")
-        async with self.session.get(page_url) as response:
-            if response.status != 200:
-                html = None
-                Logger.error(
-                    f"Error: {response.status} while fetching page: {page_url}"
+        cache: ResponseCache | None = PageCache
+        cached: Dict[str, Any] | None = (
+            await cache.load(page_url) if cache else None
+        )
+        attempt: int = 0
+        while True:
+            delay: float = min(self.RetryBackoff * 2**attempt, MaxRetryDelay)
+            try:
+                async with requests_semaphore(), self.session.get(
+                    page_url, headers=ResponseCache.conditional_headers(cached)
+                ) as response:
+                    status: int = response.status
+                    if status == 304 and cached is not None:
+                        Logger.debug(
+                            f"Page not modified, using cache: {page_url}"
+                        )
+                        page = FetchResult(page_url, 200, cached["html"])
+                        RecentPagesCache.put(page)
+                        return page
+
+                    if status == 200:
+                        html, text, truncated = await self.read_body(
+                            response
+                        )
+                        page = FetchResult(page_url, status, html, text)
+                        if truncated:
+                            # a truncated page isn't cached, so it's not
+                            # served as the complete page later
+                            return page
+                        if cache:
+                            await cache.store(page_url, response, html)
+                        RecentPagesCache.put(page)
+                        return page
+
+                    if (
+                        status not in RetryStatuses
+                        or attempt >= self.MaxRetries
+                    ):
+                        Logger.error(
+                            f"Error: {status} while fetching page: {page_url}"
+                        )
+                        return FetchResult(page_url, status, None)
+
+                    requested: float | None = retry_after(response)
+                    if requested is not None:
+                        delay = requested
+                    Logger.warning(
+                        f"Error: {status} while fetching page: {page_url}, "
+                        f"retrying in {delay:.1f}s"
+                    )
+            except (
+                aiohttp.ClientConnectionError, asyncio.TimeoutError
+            ) as exc:
+                if attempt >= self.MaxRetries:
+                    raise
+                Logger.warning(
+                    f"Error: {exc!r} while fetching page: {page_url}, "
+                    f"retrying in {delay:.1f}s"
+                )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def read_body(
+        self, response: aiohttp.ClientResponse
+    ) -> Tuple[str, str | None, bool]:
+        """Read a response's body in chunks, up to MaxPageSize bytes.
+
+        If lxml is installed, each chunk's raw bytes are fed to a parser as
+        soon as they arrive, so the page's text is extracted while the rest
+        of the page is downloaded (see PageTextTarget). The parser decodes
+        the bytes itself, and the whole body is decoded once, after it's
+        read.
+
+        If the body is larger than MaxPageSize, the rest of it is not
+        downloaded and the response's connection is closed.
+
+        :param response: the response to read
+        :type response: aiohttp.ClientResponse
+        :return: The (possibly truncated) body, decoded as utf-8, the text of
+        its body, or None if lxml isn't installed, and whether the body was
+        truncated
+        :rtype: Tuple[str, str | None, bool]
+        """
+        parser = (
+            lxml_etree.HTMLParser(target=PageTextTarget(), encoding="utf-8")
+            if lxml_etree is not None
+            else None
+        )
+        body: bytearray = bytearray()
+        truncated: bool = False
+        async for chunk in response.content.iter_chunked(self.ChunkSize):
+            if len(body) + len(chunk) > self.MaxPageSize:
+                truncated = True
+                Logger.warning(
+                    f"Page: {response.url} exceeds {self.MaxPageSize} bytes, "
+                    f"the rest of the page is skipped"
+                )
+                chunk = chunk[: self.MaxPageSize - len(body)]
+                response.close()
+            body.extend(chunk)
+            if parser is not None:
+                parser.feed(chunk)
+            if len(body) >= self.MaxPageSize:
+                break
+
+        html: str = body.decode("utf-8", errors="replace")
+        if parser is None:
+            return html, None, truncated
+
+        try:
+            text: str = parser.close()
+        except lxml_etree.XMLSyntaxError:
+            text = ""
+        return html, text, truncated
+
+    async def fetch_pages(
+        self, page_url: Callable[[int], str], first_page: int = 1
+    ) -> List[FetchResult]:
+        """Get the contents of consecutive pages until a page is not found.
+
+        If ProbeLastPage is set, the last page is found first with
+        find_last_page(), then all pages are fetched concurrently. If probing
+        fails, or ProbeLastPage isn't set, pages are fetched in a sliding
+        window (see fetch_page_window()).
+
+        :param page_url: A callable that returns the url of a page given its
+        index
+        :type page_url: Callable[[int], str]
+        :param first_page: index of the first page
+        :type first_page: int
+        :return: A list of FetchResult instances for the pages that were found
+        :rtype: List[FetchResult]
+        """
+        if not self.ProbeLastPage:
+            return await self.fetch_page_window(page_url, first_page)
+
+        try:
+            last_page: int | None = await self.find_last_page(
+                page_url, first_page
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            Logger.warning(
+                f"Failed to find the last page of {self.Name}: {exc!r}, "
+                f"fetching pages in a sliding window"
+            )
+            return await self.fetch_page_window(page_url, first_page)
+
+        if last_page is None:
+            return []
+        Logger.debug(f"Last page of {self.Name}: {last_page}")
+        responses = await asyncio.gather(
+            *[
+                self.fetch_page(page_url(index))
+                for index in range(first_page, last_page + 1)
+            ],
+            return_exceptions=True,
+        )
+        pages: List[FetchResult] = []
+        for response in responses:
+            if isinstance(response, Exception):
+                Logger.error(f"Error: {response!r} while fetching page")
+                continue
+            pages.append(response)
+        return pages
+
+    async def page_exists(self, page_url: str) -> bool:
+        """Check if a page exists using a HEAD request. If the site doesn't
+        allow HEAD requests, the page is fetched instead.
+
+        :param page_url: url of the page
+        :type page_url: str
+        :return: True if the page is found (2xx), False if it's not found
+        (404)
+        :rtype: bool
+        :raises: aiohttp.ClientResponseError for any other status, e.g. when
+        the site blocks HEAD requests (403), rate limits them (429), or fails
+        (5xx), since the page's existence can't be told
+        """
+        async with requests_semaphore(), self.session.head(
+            page_url, allow_redirects=True
+        ) as response:
+            status: int = response.status
+            request_info: aiohttp.RequestInfo = response.request_info
+            history: Tuple[aiohttp.ClientResponse, ...] = response.history
+        if status == 405:
+            status = (await self.fetch_page(page_url)).status
+        if status == 404:
+            return False
+        if not 200 <= status < 300:
+            raise aiohttp.ClientResponseError(
+                request_info,
+                history,
+                status=status,
+                message=f"Unexpected status while probing: {page_url}",
+            )
+        return True
+
+    async def find_last_page(
+        self, page_url: Callable[[int], str], first_page: int = 1
+    ) -> int | None:
+        """Find the index of the last page that exists.
+
+        Pages at exponentially growing offsets from the first page (1, 2, 4,
+        8, ...) are probed, ProbesPerRound at a time, until a page is not
+        found. Then the last page is binary searched between the last page
+        found and the first page not found. Probing stops at the MaxPages-th
+        page, which is taken as the last page if it's found.
+
+        :param page_url: A callable that returns the url of a page given its
+        index
+        :type page_url: Callable[[int], str]
+        :param first_page: index of the first page
+        :type first_page: int
+        :return: index of the last page, or None if the first page isn't found
+        :rtype: int | None
+        :raises: aiohttp.ClientResponseError if a probe gets a status other
+        than 2xx or 404 (see page_exists())
+        """
+        if not await self.page_exists(page_url(first_page)):
+            return None
+
+        limit: int = first_page + self.MaxPages - 1
+        found: int = first_page
+        not_found: int | None = None
+        exponent: int = 0
+        while not_found is None:
+            if found >= limit:
+                Logger.warning(
+                    f"{self.Name} has more than {self.MaxPages} pages, "
+                    f"only the first {self.MaxPages} pages are fetched"
                 )
+                return limit
+            indices: List[int] = sorted(
+                {
+                    min(first_page + 2**power, limit)
+                    for power in range(
+                        exponent, exponent + self.ProbesPerRound
+                    )
+                }
+            )
+            exponent += self.ProbesPerRound
+            exists: List[bool] = await asyncio.gather(
+                *[self.page_exists(page_url(index)) for index in indices]
+            )
+            for index, page_found in zip(indices, exists):
+                if not page_found:
+                    not_found = index
+                    break
+                found = index
+
+        while not_found - found > 1:
+            middle: int = (found + not_found) // 2
+            if await self.page_exists(page_url(middle)):
+                found = middle
             else:
-                html = await response.text(encoding="utf-8")
-        return FetchResult(page_url, response.status, html)
+                not_found = middle
+        return found
+
+    async def fetch_page_window(
+        self, page_url: Callable[[int], str], first_page: int = 1
+    ) -> List[FetchResult]:
+        """Get the contents of consecutive pages until a page is not found.
+
+        Pages are fetched in a sliding window: a new page is requested as soon
+        as a request in the window completes, so a slow page doesn't hold
+        back the pages after it. The window starts with FirstPageWindow pages
+        and grows by a page for each page that's found, up to MaxPageWindow.
+        As soon as a page is not found (404), no more pages are requested, and
+        requests of the pages after it that are still in flight are
+        cancelled. Requesting pages also stops if as many consecutive
+        requests as the window's size fail, or MaxPages pages are requested.
+
+        :param page_url: A callable that returns the url of a page given its
+        index
+        :type page_url: Callable[[int], str]
+        :param first_page: index of the first page
+        :type first_page: int
+        :return: A list of FetchResult instances for the pages that were found
+        :rtype: List[FetchResult]
+        """
+        pages: Dict[int, FetchResult] = {}
+        tasks: Dict[asyncio.Task, int] = {}
+        next_page: int = first_page
+        last_page: int | None = None
+        window: int = self.FirstPageWindow
+        failures: int = 0
+        try:
+            while True:
+                while (
+                    last_page is None
+                    and failures < window
+                    and len(tasks) < window
+                    and next_page < first_page + self.MaxPages
+                ):
+                    task = asyncio.create_task(
+                        self.fetch_page(page_url(next_page))
+                    )
+                    tasks[task] = next_page
+                    next_page += 1
+                if not tasks:
+                    break
+
+                done, _ = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index: int = tasks.pop(task)
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        Logger.error(
+                            f"Error: {task.exception()!r} while fetching page"
+                        )
+                        failures += 1
+                        continue
+                    failures = 0
+                    if task.result().status != 404:
+                        pages[index] = task.result()
+                        window = min(window + 1, self.MaxPageWindow)
+                    elif last_page is None or index < last_page:
+                        last_page = index
+                        for later_task, later_index in tasks.items():
+                            if later_index > index:
+                                self.cancel_page(page_url(later_index))
+                                later_task.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return [
+            pages[index]
+            for index in sorted(pages)
+            if last_page is None or index < last_page
+        ]
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get the aiohttp.ClientSession shared by all sites, the session is
+    created on first use.
+
+    The session must be closed with close_session() before the event loop
+    that uses it is closed. Each event loop gets its own session (see
+    bind_running_loop()).
+
+    :return: The shared session
+    :rtype: aiohttp.ClientSession
+    """
+    global SharedSession
+    bind_running_loop()
+    async with SharedSessionLock:
+        if SharedSession is None or SharedSession.closed:
+            SharedSession = await StaticFetch.create_session()
+    return SharedSession
+
+
+async def close_session() -> None:
+    """Close the aiohttp.ClientSession shared by all sites, if it was created
+    in the running event loop, and forget the asyncio objects bound to the
+    loop (see bind_running_loop()).
+
+    :return: None
+    """
+    global SharedLoop, RequestsSemaphore, SharedSession, SharedSessionLock
+    bind_running_loop()
+    if SharedSession is not None:
+        await SharedSession.close()
+    SharedLoop = None
+    RequestsSemaphore = None
+    SharedSession = None
+    SharedSessionLock = None
 
 
 class BaseSite(abc.ABC):
@@ -156,6 +1568,8 @@ class BaseSite(abc.ABC):
     Class Attributes:
         - Name: The name of the site
         - HomePage: The home page of the site
+        - MaxConcurrentNames: The maximum number of names search_names()
+        searches concurrently
 
     Methods:
         - fetch_page: Get the contents of a web page
@@ -165,20 +1579,154 @@ class BaseSite(abc.ABC):
 
     Name: str = ""
     HomePage: str = ""
+    MaxConcurrentNames: int = 32
 
     @staticmethod
     def grep_html(html: str, text: str) -> List[str]:
         """Search the html of a web page for a text"""
-        matches: List[str] = []
-        parsed_html = BeautifulSoup(html, "html.parser")
-        body = parsed_html.body
-        for line in body.text.split("\n"):
-            if re.search(f"\\b{text}\\b", line, re.IGNORECASE):
-                matches.append(line.strip())
+        return BaseSite.grep_html_names(html, [text])[text]
+
+    @staticmethod
+    def grep_html_names(html: str, names: List[str]) -> Dict[str, List[str]]:
+        """Search the html of a web page for multiple names.
+
+        The page's text is extracted once (see page_text()), and scanned
+        once for all names.
+
+        :param html: the html of the page
+        :type html: str
+        :param names: names to search for
+        :type names: List[str]
+        :return: A dictionary that maps each name to the lines that contain it
+        :rtype: Dict[str, List[str]]
+        """
+        return BaseSite.grep_text_names(page_text(html), names)
+
+    @staticmethod
+    def grep_text_names(text: str, names: List[str]) -> Dict[str, List[str]]:
+        """Search text for lines that contain any of multiple names.
+
+        The whole text is scanned once for all names (see
+        candidate_lines()). Only the lines where any name was found are
+        checked, and only for the names found in them, so names that
+        overlap (e.g. "Lian" and "Lian Hussein") are still matched
+        separately. Lines are sliced out
+        of the text around each match, the text is never split into a list
+        of lines. A case-folded substring check (see fold_case()) skips the
+        names that aren't in a line before running the name's regex. Empty
+        and whitespace-only names are never found.
+
+        :param text: the text to search
+        :type text: str
+        :param names: names to search for
+        :type names: List[str]
+        :return: A dictionary that maps each name to the lines that contain it
+        :rtype: Dict[str, List[str]]
+        """
+        matches: Dict[str, List[str]] = {name: [] for name in names}
+        unique_names: Tuple[str, ...] = tuple(
+            name for name in matches if name.strip()
+        )
+        if not unique_names:
+            return matches
+
+        patterns: Dict[str, Tuple[str, re.Pattern]] = names_checks(
+            unique_names
+        )
+        for line, line_names in candidate_lines(text, unique_names):
+            folded_line: str = fold_case(line)
+            for name in line_names:
+                folded_name, pattern = patterns[name]
+                if folded_name in folded_line and pattern.search(line):
+                    matches[name].append(line.strip())
         return matches
 
+    @staticmethod
+    def grep_page_names(
+        page: FetchResult, names: List[str]
+    ) -> Dict[str, List[str]]:
+        """Search a fetched page for multiple names.
+
+        The text extracted while the page was downloaded is used if there is
+        one, otherwise the page's html is searched (see grep_html_names()).
+
+        :param page: the fetched page
+        :type page: FetchResult
+        :param names: names to search for
+        :type names: List[str]
+        :return: A dictionary that maps each name to the lines that contain it
+        :rtype: Dict[str, List[str]]
+        """
+        if page.text is not None:
+            return BaseSite.grep_text_names(page.text, names)
+        return BaseSite.grep_html_names(page.html, names)
+
+    @classmethod
+    async def async_grep_page(cls, page: FetchResult, name: str) -> List[str]:
+        """Search a fetched page for a name off the event loop. See
+        async_grep_page_names()."""
+        return (await cls.async_grep_page_names(page, [name]))[name]
+
+    @classmethod
+    async def async_grep_page_names(
+        cls, page: FetchResult, names: List[str]
+    ) -> Dict[str, List[str]]:
+        """Search a fetched page for multiple names in GrepExecutor, or in a
+        worker thread if GrepExecutor isn't set. See grep_page_names().
+
+        The page is sent to GrepExecutor once with all the names. If the
+        page's text was already extracted, its html isn't sent.
+        """
+        if GrepExecutor is None:
+            return await asyncio.to_thread(cls.grep_page_names, page, names)
+
+        if page.text is not None:
+            page = page._replace(html=None)
+        return await asyncio.get_running_loop().run_in_executor(
+            GrepExecutor, cls.grep_page_names, page, names
+        )
+
+    async def search_pages(
+        self, pages: List[FetchResult], martyr_names: List[str]
+    ) -> List[SearchResult]:
+        """Search already fetched pages for multiple names.
+
+        Each page is parsed and scanned once for all the names, instead of
+        once per name.
+
+        :param pages: fetched pages to search, pages without html are skipped,
+        and pages with the same url are searched once
+        :type pages: List[FetchResult]
+        :param martyr_names: names to search for in the pages
+        :type martyr_names: List[str]
+        :return: A list of SearchResult instances that contains the name, the
+        page url and the instances where the name was mentioned
+        :rtype: List[SearchResult]
+        """
+        pages = list({page.url: page for page in pages if page.html}.values())
+        pages_matches: List[Dict[str, List[str]]] = await asyncio.gather(
+            *[
+                self.async_grep_page_names(page, martyr_names)
+                for page in pages
+            ]
+        )
+        search_results: List[SearchResult] = []
+        for name in martyr_names:
+            for page, matches in zip(pages, pages_matches):
+                if matches[name]:
+                    search_results.append(
+                        SearchResult(page.url, name, matches[name])
+                    )
+                    Logger.debug(
+                        f"Found {len(matches[name])} match(es) for {name} in "
+                        f"{page.url}"
+                    )
+                else:
+                    Logger.debug(f"Found no matches for {name} in {page.url}")
+        return search_results
+
     @abc.abstractmethod
-    async def search_setup(self) -> None:
+    async def search_setup(self, **kwargs) -> None:
         """Setup any objects required for searching the site.
         It's called in object's __init__, and should add objects
         as attributes to the class. The attributes can be used by other
@@ -187,6 +1735,9 @@ class BaseSite(abc.ABC):
         can be used in the search_name, instead of creating a new
         session for each call of search_name.
 
+        Keyword arguments passed to search_names() are passed to this method,
+        for example a shared aiohttp.ClientSession as `session`.
+
         :return: None
         """
         ...
@@ -223,16 +1774,22 @@ class BaseSite(abc.ABC):
         ...
 
     async def search_names(
-        self, martyr_names: List[str]
+        self, martyr_names: List[str], **kwargs
     ) -> List[SearchResult]:
         """Searches the site for martyrs by name.
 
         It uses the class's implementation of search_name() method to search
         for multiple names in the site. It calls search_setup() once before
-        searching, and search_teardown() after search is complete.
+        searching, and search_teardown() after search is complete, even if
+        the search failed or was cancelled.
+
+        Names are searched in a TaskGroup, at most MaxConcurrentNames at a
+        time. If searching a name fails, the searches of the other names are
+        cancelled.
 
         :param martyr_names: names to search for in the site
         :type martyr_names: List[str]
+        :param kwargs: keyword arguments passed to search_setup()
         :return: A list of SearchResult instances that contains the name, the
         search query and the instances where the name was mentioned
         :rtype: List[SearchInstance]
@@ -240,11 +1797,22 @@ class BaseSite(abc.ABC):
         Logger.info(
             f"Searching site: {self.Name} for names: {', '.join(martyr_names)}"
         )
-        await self.search_setup()
-        tasks = [self.search_name(name) for name in martyr_names]
-        results: List[List[SearchResult]] = await asyncio.gather(*tasks)
-        await self.search_teardown()
-        return list(chain(*results))
+        names_semaphore = asyncio.Semaphore(self.MaxConcurrentNames)
+
+        async def bounded_search_name(name: str) -> List[SearchResult]:
+            async with names_semaphore:
+                return await self.search_name(name)
+
+        await self.search_setup(**kwargs)
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                tasks = [
+                    task_group.create_task(bounded_search_name(name))
+                    for name in martyr_names
+                ]
+        finally:
+            await self.search_teardown()
+        return list(chain.from_iterable(task.result() for task in tasks))
 
 
 class SinglePageSite(StaticFetch, BaseSite):
@@ -266,8 +1834,8 @@ class SinglePageSite(StaticFetch, BaseSite):
     def __init__(self):
         self.html: List[FetchResult] = []
 
-    async def search_setup(self):
-        await self.fetch_setup()
+    async def search_setup(self, **kwargs):
+        await self.fetch_setup(**kwargs)
         self.html: List[FetchResult] = await asyncio.gather(
             *[self.fetch_page(url) for url in self.URLS]
         )
@@ -283,7 +1851,7 @@ class SinglePageSite(StaticFetch, BaseSite):
             if page.html is None:
                 break
 
-            matches = self.grep_html(page.html, martyr_name)
+            matches = await self.async_grep_page(page, martyr_name)
             if matches:
                 search_results.append(
                     SearchResult(page.url, martyr_name, matches)
@@ -298,6 +1866,21 @@ class SinglePageSite(StaticFetch, BaseSite):
 
         return search_results
 
+    async def search_names(
+        self, martyr_names: List[str], **kwargs
+    ) -> List[SearchResult]:
+        Logger.info(
+            f"Searching site: {self.Name} for names: {', '.join(martyr_names)}"
+        )
+        await self.search_setup(**kwargs)
+        try:
+            results: List[SearchResult] = await self.search_pages(
+                self.html, martyr_names
+            )
+        finally:
+            await self.search_teardown()
+        return results
+
 
 class SinglePageQuerySite(StaticFetch, BaseSite):
     """A Basic site where the response of a query URL is searched for names.
@@ -312,13 +1895,15 @@ class SinglePageQuerySite(StaticFetch, BaseSite):
 
     Class Attributes:
         - QueryTemplates: The query templates for the site used to search for
-        names. Query templates must contain the {name} placeholder.
+        names. Query templates must contain the {name} placeholder. Each
+        query url is fetched once between search_setup() and
+        search_teardown(), even if multiple templates or names produce it.
     """
 
     QueryTemplates: List[str] = ""
 
-    async def search_setup(self):
-        await self.fetch_setup()
+    async def search_setup(self, **kwargs):
+        await self.fetch_setup(**kwargs)
 
     async def search_teardown(self):
         await self.fetch_teardown()
@@ -327,10 +1912,13 @@ class SinglePageQuerySite(StaticFetch, BaseSite):
         self, martyr_name: str, **kwargs
     ) -> List[SearchResult]:
         Logger.debug(f"Searching site: {self.Name} for name {martyr_name}...")
-        queries = [
-            q.format(name=parse.quote_plus(martyr_name))
-            for q in self.QueryTemplates
-        ]
+        # templates that format to the same url are fetched and searched once
+        queries = list(
+            dict.fromkeys(
+                q.format(name=parse.quote_plus(martyr_name))
+                for q in self.QueryTemplates
+            )
+        )
         Logger.debug(f"Queries: {queries}")
 
         tasks = [self.fetch_page(query) for query in queries]
@@ -343,7 +1931,9 @@ class SinglePageQuerySite(StaticFetch, BaseSite):
             if page.status != 200:
                 continue
 
-            matches: List[str] = self.grep_html(page.html, martyr_name)
+            matches: List[str] = await self.async_grep_page(
+                page, martyr_name
+            )
             if matches:
                 search_results.append(
                     SearchResult(page.url, martyr_name, matches)
@@ -372,21 +1962,39 @@ class PaginatedSite(StaticFetch, BaseSite):
     UrlTemplate: str = ""
     FirstPage: int = 1
 
-    async def search_setup(self) -> None:
-        await super().fetch_setup()
-        self.page_index: int = self.FirstPage
+    async def search_setup(self, **kwargs) -> None:
+        await self.fetch_setup(**kwargs)
+        self.pages_request: asyncio.Task | None = None
 
     async def search_teardown(self) -> None:
+        self.pages_request = None
         await self.fetch_teardown()
 
     async def search_name(
         self, martyr_name: str, **kwargs
     ) -> List[SearchResult]:
+        """Search a page of the site for a name, or all the site's pages if
+        no page is given.
+
+        :param martyr_name: name to search for
+        :type martyr_name: str
+        :param kwargs: `page`, a FetchResult of the page to search
+        :return: A list of SearchResult instances for the pages that contain
+        the name
+        :rtype: List[SearchResult]
+        """
         Logger.debug(f"Searching for name {martyr_name} in {self.Name}...")
-        page = kwargs["page"]
+        page: FetchResult | None = kwargs.get("page")
+        if page is None:
+            return await self.search_pages(
+                await self.get_shared_pages(), [martyr_name]
+            )
+
         search_results: List[SearchResult] = []
         if page.html:
-            matches: List[str] = self.grep_html(page.html, martyr_name)
+            matches: List[str] = await self.async_grep_page(
+                page, martyr_name
+            )
             if matches:
                 search_results.append(
                     SearchResult(page.url, martyr_name, matches)
@@ -400,51 +2008,42 @@ class PaginatedSite(StaticFetch, BaseSite):
 
     async def get_pages(self) -> List[FetchResult]:
         pages: List[FetchResult] = []
-        iter_pages: bool = True
-        while iter_pages:
-            if self.page_index == 0:
-                pages.append(
-                    await self.fetch_page(self.UrlTemplate.format(page=""))
-                )
-                self.page_index = 2
-            else:
-                pages.extend(
-                    await asyncio.gather(
-                        *[
-                            self.fetch_page(self.UrlTemplate.format(page=page))
-                            for page in range(
-                                self.page_index, self.page_index + 5
-                            )
-                        ]
-                    )
-                )
-                self.page_index += 5
-
-            for page in pages:
-                if page.status == 404:
-                    iter_pages = False
-                    break
+        page_index: int = self.FirstPage
+        page_url: Callable[[int], str] = page_url_template(self.UrlTemplate)
+        if page_index == 0:
+            pages.append(await self.fetch_page(page_url("")))
+            page_index = 2
 
+        pages.extend(await self.fetch_pages(page_url, page_index))
         return pages
 
+    async def get_shared_pages(self) -> List[FetchResult]:
+        """Get the site's pages, walking the pagination once between
+        search_setup() and search_teardown(). Concurrent and later calls
+        share the pages of the first call.
+
+        :return: A list of FetchResult instances for the site's pages
+        :rtype: List[FetchResult]
+        """
+        if self.pages_request is None:
+            self.pages_request = asyncio.create_task(self.get_pages())
+        return await asyncio.shield(self.pages_request)
+
     async def search_names(
-        self, martyr_names: List[str]
+        self, martyr_names: List[str], **kwargs
     ) -> List[SearchResult]:
         Logger.info(
             f"Searching site: {self.Name} for names: {', '.join(martyr_names)}"
         )
-        await self.search_setup()
-
-        pages: List[FetchResult] = await self.get_pages()
-        tasks = [
-            self.search_name(name, page=page)
-            for name in martyr_names
-            for page in pages
-        ]
-        results: List[List[SearchResult]] = await asyncio.gather(*tasks)
-
-        await self.search_teardown()
-        return list(chain(*results))
+        await self.search_setup(**kwargs)
+        try:
+            pages: List[FetchResult] = await self.get_shared_pages()
+            results: List[SearchResult] = await self.search_pages(
+                pages, martyr_names
+            )
+        finally:
+            await self.search_teardown()
+        return results
 
 
 class PaginatedQuerySite(StaticFetch, BaseSite):
@@ -465,9 +2064,8 @@ class PaginatedQuerySite(StaticFetch, BaseSite):
     QueryTemplate: str = ""
     StartPage: int = 1
 
-    async def search_setup(self):
-        await super().fetch_setup()
-        self.page = 1
+    async def search_setup(self, **kwargs):
+        await self.fetch_setup(**kwargs)
 
     async def search_teardown(self) -> None:
         await self.fetch_teardown()
@@ -478,40 +2076,28 @@ class PaginatedQuerySite(StaticFetch, BaseSite):
         Logger.debug(f"Searching for name {martyr_name} in {self.Name}...")
         results: List[SearchResult] = []
 
-        request_pages: bool = True
-        while request_pages:
-            tasks = [
-                self.fetch_page(
-                    self.QueryTemplate.format(
-                        name=parse.quote_plus(martyr_name),
-                        page=page
-                    )
+        responses: List[FetchResult] = await self.fetch_pages(
+            page_url_template(
+                self.QueryTemplate, name=parse.quote_plus(martyr_name)
+            ),
+            self.StartPage,
+        )
+        for response in responses:
+            if response.html:
+                page_results: List[str] = await self.async_grep_page(
+                    response, martyr_name
                 )
-                for page in range(self.page, self.page + 5)
-            ]
-            self.page += 5
-            responses = await asyncio.gather(*tasks)
-            for response in responses:
-                if response.status == 404:
-                    request_pages = False
-                    continue
-                if response.html:
-                    page_results: List[str] = self.grep_html(
-                        response.html, martyr_name
+                if page_results:
+                    results.append(
+                        SearchResult(response.url, martyr_name, page_results)
+                    )
+                    Logger.debug(
+                        f"Found {len(page_results)} match(es) in {response.url}"
+                    )
+                else:
+                    Logger.debug(
+                        f"Found no matches for {martyr_name} in {response.url}"
                     )
-                    if page_results:
-                        results.append(
-                            SearchResult(
-                                response.url, martyr_name, page_results
-                            )
-                        )
-                        Logger.debug(
-                            f"Found {len(page_results)} match(es) in {response.url}"
-                        )
-                    else:
-                        Logger.debug(
-                            f"Found no matches for {martyr_name} in {response.url}"
-                        )
         return results
 
 
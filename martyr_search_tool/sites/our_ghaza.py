@@ -22,11 +22,18 @@ articles is straight forward.
 
 ## Strategy
 
-1. Get the first page that contains all articles:
-    https://ourgaza.com/martyrs/1,
-    page_number=1
-2. search for an article that contains the name.
-3. Increment page_number, and repeat from step 1 till we get a 404 Error.
+1. Get the first page, https://ourgaza.com/martyrs/ (it has no page
+    index).
+2. Find the last page with HEAD requests to https://ourgaza.com/martyrs/2,
+    then pages 3, 4, 6, 10, ... (2 + 1, 2 + 2, 2 + 4, ...), then a binary
+    search between the last page found and the first page missing.
+3. Get the pages from https://ourgaza.com/martyrs/2 to
+    https://ourgaza.com/martyrs/<last page>, concurrently.
+4. search the pages for articles that contain the names.
+
+If the last page can't be found, the pages from
+https://ourgaza.com/martyrs/2 onward are fetched 8 at a time, in a window
+that slides forward as pages arrive, till we get a 404 Error.
 
 """
 
@@ -38,6 +45,8 @@ class OurGhaza(base_site.PaginatedSite):
     HomePage: str = "https://ourgaza.com/"
     UrlTemplate: str = "https://ourgaza.com/martyrs/{page}"
     FirstPage: int = 0
+    FirstPageWindow: int = 8
+    ProbeLastPage: bool = True
 
 
 if __name__ == "__main__":
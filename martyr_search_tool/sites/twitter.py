@@ -11,12 +11,14 @@ directory as the tool, it should contain the username, email and password.
 
 """
 
+import asyncio
+import functools
 import logging as log
 from pathlib import Path
-import re
 import tomllib
-from typing import Dict, Final, List, Any
+from typing import Any, Dict, Final, List, Set, Tuple
 
+import httpx
 from twikit import Tweet
 from twikit.errors import TwitterException
 from twikit.twikit_async import Client
@@ -32,10 +34,28 @@ CONFIG_FILE: Final[Path] = Path(__file__).parent.parent / "config.toml"
 # Path to cookies file, used to skip logging in each time the tool is used
 COOKIES_FILE: Final[Path] = Path(__file__).parent.parent / ".twitter_cookies"
 
+# Maximum number of pages of search results to get for each search term
+MAX_PAGES: Final[int] = 3
 
+# Connection pool limits of the twitter client, idle connections are kept
+# alive between searches to skip the TCP and TLS handshakes
+CLIENT_LIMITS: Final[httpx.Limits] = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=75
+)
+
+# Twitter client shared by all searches, and the event loop it belongs to,
+# see get_client()
+SharedClient: Client | None = None
+SharedClientLoop: asyncio.AbstractEventLoop | None = None
+
+
+@functools.lru_cache(maxsize=1)
 def get_credentials(file: Path) -> Dict[str, str] | None:
     """Get credentials to user for Twitter login from configuration file
 
+    The file is parsed once, later calls with the same file return the same
+    credentials.
+
     :param file: path to a toml file that contains twitter credentials
     :type file: pathlib.Path
     :return: credentials from the file, or None if `file` is not a file
@@ -45,7 +65,28 @@ def get_credentials(file: Path) -> Dict[str, str] | None:
     """
     if not file.is_file():
         return None
-    return tomllib.loads(file.read_text())["twitter"]
+    with file.open("rb") as config:
+        return tomllib.load(config)["twitter"]
+
+
+def get_client() -> Client:
+    """Get the twitter client shared by all searches in the running event
+    loop, the client is created on first use in each event loop.
+
+    The client's connections belong to the event loop they were opened in,
+    so a client isn't shared across event loops (e.g. two asyncio.run()
+    calls). The client's connection pool is limited by CLIENT_LIMITS, and
+    its cookies are kept between searches.
+
+    :return: the shared twitter client
+    :rtype: twikit.twikit_async.Client
+    """
+    global SharedClient, SharedClientLoop
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    if SharedClient is None or SharedClientLoop is not loop:
+        SharedClient = Client(language="en-US", limits=CLIENT_LIMITS)
+        SharedClientLoop = loop
+    return SharedClient
 
 
 async def client_login(
@@ -104,14 +145,18 @@ def create_tweet_link(tweet: Tweet) -> str:
     return f"https://twitter.com/{tweet.user.name}/status/{tweet.id}"
 
 
-async def get_tweets_containing_term(client: Client, search_term: str) -> List[
-    Tweet]:
-    """Gets all tweets containing the given search term
+async def get_tweets_containing_term(
+    client: Client, search_term: str, max_pages: int = MAX_PAGES
+) -> List[Tweet]:
+    """Gets the tweets containing the given search term, from the first
+    `max_pages` pages of search results
 
     :param client: a twitter client that is logged in using `client_login`
     :type client: twikit.twikit_async.Client
     :param search_term: a string that is used to search for tweets
     :type search_term: str
+    :param max_pages: maximum number of pages of search results to get
+    :type max_pages: int
     :return: a list of tweets that contain the search term
     :rtype: List[Tweet]
     :raises: twikit.errors.TooManyRequests when too many requests are made and twitter
@@ -120,7 +165,7 @@ async def get_tweets_containing_term(client: Client, search_term: str) -> List[
     results = list()
 
     try:
-        # get tweets that contain search_term
+        # get the first page of tweets that contain search_term
         tweets = await client.search_tweet(search_term, "Top")
 
     except TwitterException as tw_exc:
@@ -129,26 +174,67 @@ async def get_tweets_containing_term(client: Client, search_term: str) -> List[
             )
         return []
 
-    else:
-        # append tweets to results
-        for tweet in tweets:
-            results.append(tweet)
+    for page in range(1, max_pages + 1):
+        results.extend(tweets)
+        if page == max_pages or not tweets or not tweets.next_cursor:
+            break
+
+        try:
+            tweets = await tweets.next()
+
+        except TwitterException as tw_exc:
+            Logger.warning(
+                f"Getting more tweets for {search_term} failed due to "
+                f"error: {tw_exc}"
+            )
+            break
 
     return results
 
 
+def batch_query(martyr_names: Tuple[str, ...]) -> str:
+    """Create a search query that matches tweets that contain any of the
+    names. A single name is searched for as is, multiple names are searched
+    for as exact phrases joined with OR.
+
+    Example:
+    >>> batch_query(("Lian Hussein", "Ali"))
+    '"Lian Hussein" OR "Ali"'
+
+    :param martyr_names: names to search for
+    :type martyr_names: Tuple[str, ...]
+    :return: the search query
+    :rtype: str
+    """
+    if len(martyr_names) == 1:
+        return martyr_names[0]
+    # quotes in a name would end its phrase early
+    phrases: List[str] = [name.replace('"', "") for name in martyr_names]
+    return " OR ".join(f'"{phrase}"' for phrase in phrases)
+
+
 class Twitter(base_site.BaseSite):
     Name: str = "Twitter"
     HomePage: str = "https://twitter.com"
+    NamesPerQuery: int = 10
+    MaxQueryLength: int = 500
 
     def __init__(self):
-        # get credentials from config file
-        self.credentials: Dict[str, str] = get_credentials(CONFIG_FILE)
+        # credentials are read from the config file by search_setup()
+        self.credentials: Dict[str, str] | None = None
 
-        # create a client instance
-        self.client: Client = Client(language="en-US")
+        # the client shared by all searches, set by search_setup()
+        self.client: Client | None = None
 
-    async def search_setup(self) -> None:
+    async def search_setup(self, **kwargs) -> None:
+        # use the client shared by all searches in the running event loop
+        self.client = get_client()
+
+        # get credentials from config file, in a worker thread so other sites
+        # can start searching meanwhile
+        self.credentials = await asyncio.to_thread(
+            get_credentials, CONFIG_FILE
+        )
         response = await client_login(
             self.client,
             self.credentials["username"],
@@ -170,18 +256,128 @@ class Twitter(base_site.BaseSite):
             self.client,
             martyr_name
         )
-        search_results: List[SearchResult] = [
-            SearchResult(
-                create_tweet_link(tweet),
-                martyr_name,
-                [
-                    line.strip() for line in tweet.text.split() if
-                    re.search(f"\\b{martyr_name}\\b", line)
+        return self.search_tweets([martyr_name], {(martyr_name,): tweets})
+
+    async def search_names(
+        self, martyr_names: List[str], **kwargs
+    ) -> List[SearchResult]:
+        """Search twitter for multiple names.
+
+        Names are searched for in batches (see query_batches()), each batch
+        with a single query that matches any of its names. Then each tweet
+        that was found is scanned once for all the names (see
+        search_tweets()).
+
+        :param martyr_names: names to search for
+        :type martyr_names: List[str]
+        :param kwargs: keyword arguments passed to search_setup()
+        :return: A list of SearchResult instances that contains the name, the
+        tweet's link and the lines of the tweet that mention the name
+        :rtype: List[SearchResult]
+        """
+        Logger.info(
+            f"Searching site: {self.Name} for names: {', '.join(martyr_names)}"
+        )
+        batches: List[Tuple[str, ...]] = self.query_batches(martyr_names)
+        queries_semaphore = asyncio.Semaphore(self.MaxConcurrentNames)
+
+        async def bounded_search_batch(batch: Tuple[str, ...]) -> List[Tweet]:
+            async with queries_semaphore:
+                return await get_tweets_containing_term(
+                    self.client, batch_query(batch)
+                )
+
+        await self.search_setup(**kwargs)
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                tasks = [
+                    task_group.create_task(bounded_search_batch(batch))
+                    for batch in batches
                 ]
-            )
-            for tweet in tweets
-        ]
+        finally:
+            await self.search_teardown()
+        return self.search_tweets(
+            martyr_names,
+            {batch: task.result() for batch, task in zip(batches, tasks)},
+        )
 
+    @classmethod
+    def query_batches(cls, martyr_names: List[str]) -> List[Tuple[str, ...]]:
+        """Split names into batches that are searched for with one query each.
+
+        A batch has at most NamesPerQuery names, and its query (see
+        batch_query()) is at most MaxQueryLength characters long, unless it
+        has a single name.
+
+        :param martyr_names: names to split into batches
+        :type martyr_names: List[str]
+        :return: A list of batches of names
+        :rtype: List[Tuple[str, ...]]
+        """
+        batches: List[Tuple[str, ...]] = []
+        batch: List[str] = []
+        for name in dict.fromkeys(martyr_names):
+            if batch and (
+                len(batch) == cls.NamesPerQuery
+                or len(batch_query((*batch, name))) > cls.MaxQueryLength
+            ):
+                batches.append(tuple(batch))
+                batch = []
+            batch.append(name)
+        if batch:
+            batches.append(tuple(batch))
+        return batches
+
+    @staticmethod
+    def search_tweets(
+        martyr_names: List[str],
+        batches_tweets: Dict[Tuple[str, ...], List[Tweet]],
+    ) -> List[SearchResult]:
+        """Search found tweets for names.
+
+        Tweets found by multiple queries are scanned once. Each tweet's text
+        is scanned once for all the names (see BaseSite.grep_text_names()),
+        so a tweet found for one name is also matched with the other names
+        it mentions. A tweet that twitter returned for a single name's query
+        is part of the name's results even if its text doesn't mention the
+        name, a tweet returned for a batch of names is part of the results
+        of the names it mentions.
+
+        :param martyr_names: names to search for
+        :type martyr_names: List[str]
+        :param batches_tweets: A dictionary that maps each batch of names to
+        the tweets that its query found
+        :type batches_tweets: Dict[Tuple[str, ...], List[Tweet]]
+        :return: A list of SearchResult instances that contains the name, the
+        tweet's link and the lines of the tweet that mention the name
+        :rtype: List[SearchResult]
+        """
+        tweets: Dict[str, Tweet] = {
+            tweet.id: tweet
+            for batch_tweets in batches_tweets.values()
+            for tweet in batch_tweets
+        }
+        tweets_matches: Dict[str, Dict[str, List[str]]] = {
+            tweet_id: base_site.BaseSite.grep_text_names(
+                tweet.text, martyr_names
+            )
+            for tweet_id, tweet in tweets.items()
+        }
+        found_ids: Dict[str, Set[str]] = {
+            batch[0]: {tweet.id for tweet in batch_tweets}
+            for batch, batch_tweets in batches_tweets.items()
+            if len(batch) == 1
+        }
+
+        search_results: List[SearchResult] = []
+        for name in dict.fromkeys(martyr_names):
+            name_ids: Set[str] = found_ids.get(name, set())
+            for tweet_id, tweet in tweets.items():
+                matches: List[str] = tweets_matches[tweet_id][name]
+                if matches or tweet_id in name_ids:
+                    search_results.append(
+                        SearchResult(create_tweet_link(tweet), name, matches)
+                    )
         return search_results
 
 
@@ -6,27 +6,71 @@ A simple CLI to search for tweets on twitter that contains a given string,
 or any of its permutations
 """
 
+import argparse
 import asyncio
+import functools
+import hashlib
+import json
+import logging as log
 import sys
+import time
 import tomllib
-from itertools import permutations
+from itertools import chain
 from pathlib import Path
 from typing import *
 
+import httpx
 from twikit import Tweet
 from twikit.errors import TwitterException
 from twikit.twikit_async import Client
 
+Logger: Final[log.Logger] = log.getLogger(__name__)
+
 # Path to configuration file that contains Twitter login credentials
 CONFIG_FILE: Final[Path] = Path("./twitter.toml")
 
 # Path to cookies file, used to skip logging in each time the tool is used
 COOKIES_FILE: Final[Path] = Path("./.twitter_cookies")
 
+# Maximum number of pages of search results to get for each search term
+MAX_PAGES: Final[int] = 3
+
+# Connection pool limits of the twitter client, idle connections are kept
+# alive between searches to skip the TCP and TLS handshakes
+CLIENT_LIMITS: Final[httpx.Limits] = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=75
+)
+
+# Path to the directory where search results are cached between runs
+CACHE_DIR: Final[Path] = Path("./.twitter_cache")
+
+# Time, in seconds, that cached search results are used before searching again
+CACHE_TTL: Final[float] = 3600.0
+
+# Default maximum number of variations of a name that are searched for
+MAX_VARIATIONS: Final[int] = 12
+
+
+class CachedUser(NamedTuple):
+    """The author of a cached tweet"""
+    name: str
+
+
+class CachedTweet(NamedTuple):
+    """A tweet loaded from the cache, it has the attributes of a twikit.Tweet
+    that are used by the tool"""
+    id: str
+    user: CachedUser
+    text: str
 
+
+@functools.lru_cache(maxsize=1)
 def get_credentials(file: Path) -> Dict[str, str] | None:
     """Get credentials to user for Twitter login from configuration file
 
+    The file is parsed once, later calls with the same file return the same
+    credentials.
+
     :param file: path to a toml file that contains twitter credentials
     :type file: pathlib.Path
     :return: credentials from the file, or None if `file` is not a file
@@ -36,7 +80,8 @@ def get_credentials(file: Path) -> Dict[str, str] | None:
     """
     if not file.is_file():
         return None
-    return tomllib.loads(file.read_text())
+    with file.open("rb") as config:
+        return tomllib.load(config)
 
 
 async def client_login(
@@ -82,21 +127,83 @@ async def client_login(
     return {"status": "success"}
 
 
-def get_unique_name_variations(name: List[str]) -> List[str]:
-    """list all possible unique variations of a name
+def distinct_permutations(words: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+    """Generate each distinct permutation of a list of words once, in
+    lexicographic order
+
+    Unlike itertools.permutations, repeated words don't generate duplicate
+    permutations, so a name with repeated words generates k!/(product of the
+    repeat counts' factorials) permutations instead of k!.
 
     Example:
     ========
-        get_unique_name_variations(["foo", "bar", "foo"])
-        >>> "foo bar foo", "foo foo bar", "bar foo foo"
+        list(distinct_permutations(["foo", "bar", "foo"]))
+        >>> ("bar", "foo", "foo"), ("foo", "bar", "foo"), ("foo", "foo", "bar")
+
+    :param words: the words to permute
+    :type words: Sequence[str]
+    :return: an iterator over the distinct permutations
+    :rtype: Iterator[Tuple[str, ...]]
+    """
+    permutation = sorted(words)
+    while True:
+        yield tuple(permutation)
+
+        # find the last word that's smaller than the word after it, if there
+        # is none, this is the last permutation
+        i = len(permutation) - 2
+        while i >= 0 and permutation[i] >= permutation[i + 1]:
+            i -= 1
+        if i < 0:
+            return
+
+        # swap it with the last word that's bigger than it, then reverse the
+        # words after it, to get the next permutation in lexicographic order
+        j = len(permutation) - 1
+        while permutation[j] <= permutation[i]:
+            j -= 1
+        permutation[i], permutation[j] = permutation[j], permutation[i]
+        permutation[i + 1:] = reversed(permutation[i + 1:])
+
+
+@functools.lru_cache(maxsize=128)
+def get_unique_name_variations(name: Tuple[str, ...], limit: int | None = MAX_VARIATIONS) -> Tuple[str, ...]:
+    """list unique variations of a name, up to `limit` variations
+
+    Variations are cached, a name that's searched for again in the same
+    process isn't permuted again.
+
+    The name as given comes first, then its rotations, then the other
+    permutations of its words (see distinct_permutations()). Permutations are
+    only generated until `limit` unique variations are found, so long names
+    don't generate all their permutations.
 
-    :param name: a name as a list of strings
-    :type name: List[str]
-    :return: a list of space spearated strings, each string represents a unique variation of the input name
-    :rtype: List[str]
+    Example:
+    ========
+        get_unique_name_variations(("foo", "bar", "baz"), limit=4)
+        >>> "foo bar baz", "bar baz foo", "baz foo bar", "bar foo baz"
+
+    :param name: a name as a tuple of strings
+    :type name: Tuple[str, ...]
+    :param limit: maximum number of variations, or None for all variations
+    :type limit: int | None
+    :return: a tuple of space spearated strings, each string represents a unique variation of the input name
+    :rtype: Tuple[str, ...]
     """
-    variations = [" ".join(p) for p in permutations(name)]
-    return list(set(variations))
+    rotations = (name[i:] + name[:i] for i in range(len(name)))
+    seen = set()
+    variations = list()
+
+    # rotations are also generated as permutations, variations are
+    # deduplicated before they're joined, so each one is joined once
+    for variation in chain(rotations, distinct_permutations(name)):
+        if limit is not None and len(variations) >= limit:
+            break
+        if variation not in seen:
+            seen.add(variation)
+            variations.append(" ".join(variation))
+
+    return tuple(variations)
 
 
 def create_tweet_link(tweet: Tweet) -> str:
@@ -110,71 +217,240 @@ def create_tweet_link(tweet: Tweet) -> str:
     return f"https://twitter.com/{tweet.user.name}/status/{tweet.id}"
 
 
-async def get_tweets_containing_term(client: Client, search_term: str) -> List[Tweet]:
-    """Gets all tweets containing the given search term
+def get_cache_file(
+    search_term: str, max_pages: int, cache_dir: Path = CACHE_DIR
+) -> Path:
+    """Get the path of the file that caches the search results of a term
+
+    :param search_term: a string that is used to search for tweets
+    :type search_term: str
+    :param max_pages: maximum number of pages of search results
+    :type max_pages: int
+    :param cache_dir: path to the cache directory
+    :type cache_dir: pathlib.Path
+    :return: path to the cache file of the search term
+    :rtype: pathlib.Path
+    """
+    key = hashlib.sha256(
+        f"{search_term}:Top:{max_pages}".encode("utf-8")
+    ).hexdigest()
+    return cache_dir / f"{key}.json"
+
+
+def load_cached_tweets(
+    search_term: str, max_pages: int, ttl: float = CACHE_TTL
+) -> List[CachedTweet] | None:
+    """Load the cached search results of a term
+
+    :param search_term: a string that is used to search for tweets
+    :type search_term: str
+    :param max_pages: maximum number of pages of search results
+    :type max_pages: int
+    :param ttl: time, in seconds, that cached search results are used
+    :type ttl: float
+    :return: cached tweets, or None if the term's results aren't cached or
+    are older than `ttl`
+    :rtype: List[CachedTweet]
+    :return: None
+    """
+    cache_file = get_cache_file(search_term, max_pages)
+    try:
+        if time.time() - cache_file.stat().st_mtime > ttl:
+            return None
+        entries = json.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return None
+    return [
+        CachedTweet(tweet_id, CachedUser(user_name), text)
+        for tweet_id, user_name, text in entries
+    ]
+
+
+def store_cached_tweets(
+    search_term: str, max_pages: int, tweets: List[Tweet]
+) -> None:
+    """Cache the search results of a term, failures to write the cache are
+    ignored
+
+    :param search_term: a string that is used to search for tweets
+    :type search_term: str
+    :param max_pages: maximum number of pages of search results
+    :type max_pages: int
+    :param tweets: tweets that contain the search term
+    :type tweets: List[Tweet]
+    :return: None
+    """
+    entries = [[tweet.id, tweet.user.name, tweet.text] for tweet in tweets]
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        get_cache_file(search_term, max_pages).write_text(json.dumps(entries))
+    except OSError as os_err:
+        print(f"Caching tweets for {search_term} failed due to error: {os_err}")
+
+
+async def get_tweets_containing_term(
+    client: Client,
+    search_term: str,
+    use_cache: bool = True,
+    max_pages: int = MAX_PAGES,
+) -> List[Tweet]:
+    """Gets the tweets containing the given search term, from the first
+    `max_pages` pages of search results
+
+    Search results are cached for CACHE_TTL seconds, so running the tool again
+    with the same name and page limit doesn't search twitter again. The cache
+    is read and written in a worker thread. Results are not cached if getting
+    a page after the first one fails.
 
     :param client: a twitter client that is logged in using `client_login`
     :type client: twikit.twikit_async.Client
     :param search_term: a string that is used to search for tweets
     :type search_term: str
+    :param use_cache: use and update the cache of search results
+    :type use_cache: bool
+    :param max_pages: maximum number of pages of search results
+    :type max_pages: int
     :return: a list of tweets that contain the search term
     :rtype: List[Tweet]
     :raises: twikit.errors.TooManyRequests when too many requests are made and twitter
     API rate limit is exceeded
     """
+    if use_cache:
+        cached_tweets = await asyncio.to_thread(
+            load_cached_tweets, search_term, max_pages
+        )
+        if cached_tweets is not None:
+            return cached_tweets
+
     results = list()
+    complete = True
 
     try:
-        # get tweets that contain search_term
+        # get the first page of tweets that contain search_term
         tweets = await client.search_tweet(search_term, "Top")
 
     except TwitterException as tw_exc:
         print(f"Searching tweets for {search_term} failed due to error: {tw_exc}")
         return []
 
-    else:
-        # append tweets to results
-        for tweet in tweets:
-            results.append(tweet)
+    for page in range(1, max_pages + 1):
+        results.extend(tweets)
+        if page == max_pages or not tweets or not tweets.next_cursor:
+            break
+
+        try:
+            tweets = await tweets.next()
+
+        except TwitterException as tw_exc:
+            Logger.warning(
+                f"Getting more tweets for {search_term} failed due to "
+                f"error: {tw_exc}"
+            )
+            complete = False
+            break
+
+    # partial results aren't cached, so the term is searched again next time
+    if use_cache and complete:
+        await asyncio.to_thread(
+            store_cached_tweets, search_term, max_pages, results
+        )
 
     return results
 
 
-async def get_tweets_containing_name(client: Client, name: List[str]) -> List[str]:
-    """Get all tweets that contain the name or one of its variations"""
-    found_tweets = list()
+async def get_tweets_containing_name(
+    client: Client,
+    name: List[str],
+    use_cache: bool = True,
+    max_variations: int | None = MAX_VARIATIONS,
+) -> List[Tweet]:
+    """Get all tweets that contain the name or one of its variations
+
+    All the variations are searched concurrently, a variation whose search
+    fails is skipped without cancelling the searches of the other variations.
+    """
+    # found tweets by id, a tweet found by multiple variations is kept once,
+    # in the order it was first found
+    found_tweets = dict()
 
     # get all permutations of name
-    name_variateions = get_unique_name_variations(name)
-    async with asyncio.TaskGroup() as tg:
-        # create a task for each name to search for tweets that contain that name
-        tasks = [
-            tg.create_task(get_tweets_containing_term(client, variant))
+    name_variateions = get_unique_name_variations(tuple(name), max_variations)
+
+    # search for tweets that contain each variation of the name
+    results = await asyncio.gather(
+        *[
+            get_tweets_containing_term(client, variant, use_cache)
             for variant in name_variateions
-        ]
+        ],
+        return_exceptions=True,
+    )
 
-    # check results of each task
-    for task in tasks:
-        try:
-            tweets = task.result()
+    # check results of each search
+    for tweets in results:
+        if isinstance(tweets, BaseException):
+            continue
+
+        for tweet in tweets:
+            found_tweets.setdefault(tweet.id, tweet)
 
-        except Exception as exc:
-            pass
+    return list(found_tweets.values())
 
-        else:
-            for tweet in tweets:
-                if tweet not in found_tweets:
-                    found_tweets.append(tweet)
 
-    return found_tweets
+def positive_int(value: str) -> int:
+    """Convert a command line argument to a positive integer
+
+    :param value: the argument's value
+    :type value: str
+    :return: the argument's value as an integer
+    :rtype: int
+    :raises argparse.ArgumentTypeError: if value is not a positive integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got: {value}")
+    return number
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line arguments
+
+    :param args: command line arguments, without the program's name
+    :type args: List[str]
+    :return: parsed arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Search twitter for tweets that contain a name, or any of "
+        "its variations",
+    )
+    parser.add_argument("name", nargs="+", help="the words of the name")
+    parser.add_argument(
+        "-m",
+        "--max-variations",
+        type=positive_int,
+        default=MAX_VARIATIONS,
+        help=f"maximum number of variations of the name to search for (default: {MAX_VARIATIONS})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"don't use or update the cache of search results (location: {CACHE_DIR})",
+    )
+    return parser.parse_args(args)
 
 
 async def main():
+    # get name and options from command line
+    args = parse_args(sys.argv[1:])
+
     # get credentials from config file
     credentials = get_credentials(CONFIG_FILE)
 
-    # create a client instance
-    twitter_cli = Client(language="en-US")
+    # create a client instance, shared by the searches of all variations
+    twitter_cli = Client(language="en-US", limits=CLIENT_LIMITS)
 
     # login to twitter
     response = await client_login(
@@ -190,14 +466,10 @@ async def main():
         print(f"Failed to login to twitter, error message: {response['status']}")
         sys.exit(-1)
 
-    # get name from command line
-    search_name = sys.argv[1:]
-    if not search_name:
-        print("Error! you must provide a name.")
-        sys.exit(-1)
-
     # search twitter for name
-    tweets = await get_tweets_containing_name(twitter_cli, search_name)
+    tweets = await get_tweets_containing_name(
+        twitter_cli, args.name, not args.no_cache, args.max_variations
+    )
 
     # print links to found tweets
     for tweet in tweets:
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for martyr_search_tool.sites.base_site"""
+
+import asyncio
+import logging as log
+import os
+import pathlib
+import re
+import tempfile
+import time
+import unittest
+from typing import Callable, Dict, Iterator, List, Tuple
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from martyr_search_tool.sites import base_site
+from martyr_search_tool.sites.base_site import BaseSite
+
+
+class GrepHtmlTest(unittest.TestCase):
+    def setUp(self) -> None:
+        base_site.page_text.cache_clear()
+
+    def tearDown(self) -> None:
+        base_site.page_text.cache_clear()
+
+    def test_tag_inside_word(self) -> None:
+        html = "<html><body><p>Li<b>an</b> Hussein</p></body></html>"
+        self.assertEqual(BaseSite.grep_html(html, "Lian"), ["Lian Hussein"])
+
+    def test_tag_inside_word_without_optional_parsers(self) -> None:
+        html = "<html><body><p>Li<b>an</b> Hussein</p></body></html>"
+        with mock.patch.object(base_site, "lxml_etree", None):
+            self.assertEqual(
+                BaseSite.grep_html(html, "Lian"), ["Lian Hussein"]
+            )
+
+    def test_cached_page_text_matches_downloaded_page_text(self) -> None:
+        html = (
+            "<html><body><p>Lian Hussein</p></body>"
+            "<p>Omar Hussein</p></html>"
+        ).encode("utf-8")
+        parser = base_site.lxml_etree.HTMLParser(
+            target=base_site.PageTextTarget(), encoding="utf-8"
+        )
+        for start in range(0, len(html), 7):
+            parser.feed(html[start : start + 7])
+        self.assertEqual(
+            base_site.page_text(html.decode("utf-8")), parser.close()
+        )
+        self.assertEqual(
+            BaseSite.grep_html(html.decode("utf-8"), "Omar"), []
+        )
+
+
+# The optional modules candidate_lines() is given for each of its backends
+ScanBackends = {
+    "hyperscan": {
+        "hyperscan": base_site.hyperscan,
+        "ahocorasick": base_site.ahocorasick,
+    },
+    "ahocorasick": {"hyperscan": None, "ahocorasick": base_site.ahocorasick},
+    "re": {"hyperscan": None, "ahocorasick": None},
+}
+
+
+class GrepTextNamesTest(unittest.TestCase):
+    def grep_text_names(
+        self, text: str, names: List[str]
+    ) -> Iterator[Tuple[str, Dict[str, List[str]]]]:
+        """Search the text with each backend of candidate_lines() that's
+        installed, in a subtest.
+        """
+        for backend, modules in ScanBackends.items():
+            if backend != "re" and modules[backend] is None:
+                continue
+            with self.subTest(backend=backend), mock.patch.multiple(
+                base_site, **modules
+            ):
+                yield backend, BaseSite.grep_text_names(text, names)
+
+    def test_empty_names(self) -> None:
+        for _, matches in self.grep_text_names(
+            "Lian Hussein\nfoo", ["", " ", "Lian"]
+        ):
+            self.assertEqual(
+                matches, {"": [], " ": [], "Lian": ["Lian Hussein"]}
+            )
+
+    def test_backends_match_whole_words(self) -> None:
+        names = ["Lian", "Lian Hussein", "Omar", "عمر", "O'Neil", "a.b"]
+        text = "\n".join(
+            [
+                "Lian Hussein was here",
+                "  LIAN, lian and lian.  ",
+                "Liana and Julian aren't Lian's",
+                "omar/OMAR-Omar_ Omari",
+                "عمر حسين, عمرو",
+                "o'neil and O'Neill",
+                "a.b axb a-b",
+                "nothing here",
+                "",
+            ]
+        )
+        expected: Dict[str, List[str]] = {
+            name: [
+                line.strip()
+                for line in text.split("\n")
+                if re.search(rf"\b{re.escape(name)}\b", line, re.I)
+            ]
+            for name in names
+        }
+        for _, matches in self.grep_text_names(text, names):
+            self.assertEqual(matches, expected)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.tmp.name) / "cache"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_creates_directory_and_expires_entries(self) -> None:
+        cache = base_site.ResponseCache(self.directory, max_age=60)
+        path = cache.entry_path("http://example.com/")
+        cache.write_entry(path, b'{"url": "http://example.com/"}', True)
+        self.assertIsNotNone(cache.read_entry(path))
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        self.assertIsNone(cache.read_entry(path))
+        self.assertFalse(path.exists())
+
+    def test_prune_keeps_newest_entries(self) -> None:
+        cache = base_site.ResponseCache(self.directory, max_entries=2)
+        self.directory.mkdir(parents=True)
+        now = time.time()
+        for age in range(4):
+            path = self.directory / f"{age}.json"
+            path.write_bytes(b"{}")
+            os.utime(path, (now - age, now - age))
+        cache.prune()
+        self.assertEqual(
+            sorted(path.name for path in self.directory.iterdir()),
+            ["0.json", "1.json"],
+        )
+
+
+class StubSite(base_site.PaginatedSite):
+    Name: str = "Stub"
+
+
+class StubServerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests that fetch pages from a local stub server. Handlers record the
+    (method, page) of each request in self.requests.
+    """
+
+    async def asyncSetUp(self) -> None:
+        # expected errors (e.g. 404 pages) aren't logged
+        log.disable(log.CRITICAL)
+        self.addCleanup(log.disable, log.NOTSET)
+        self.requests: List[Tuple[str, int]] = []
+        self.server: TestServer | None = None
+        for name, value in (
+            ("PageCache", None),
+            ("RecentPagesCache", base_site.RecentPages(256, 600.0)),
+        ):
+            patcher = mock.patch.object(base_site, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self) -> None:
+        await base_site.close_session()
+        if self.server is not None:
+            await self.server.close()
+
+    async def start_site(
+        self,
+        handler: Callable[[web.Request, int], web.StreamResponse],
+        **attributes,
+    ) -> Tuple[StubSite, Callable[[int], str]]:
+        """Start a stub server whose pages are served by handler, and set up
+        a site (with the given class attributes) to fetch them.
+        """
+
+        async def handle(request: web.Request) -> web.StreamResponse:
+            page: int = int(request.match_info["page"])
+            self.requests.append((request.method, page))
+            return await handler(request, page)
+
+        app = web.Application()
+        app.router.add_get("/pages/{page}", handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        site: StubSite = type("StubSite", (StubSite,), attributes)()
+        await site.fetch_setup()
+        return site, lambda page: str(self.server.make_url(f"/pages/{page}"))
+
+    async def test_window_stops_at_first_404(self) -> None:
+        async def handler(request: web.Request, page: int) -> web.Response:
+            if page == 4:
+                raise web.HTTPNotFound()
+            if page > 4:
+                # pages after the missing page never answer, they must be
+                # cancelled
+                await asyncio.Event().wait()
+            return web.Response(text=f"<p>page {page}</p>")
+
+        site, page_url = await self.start_site(handler, FirstPageWindow=8)
+        pages = await asyncio.wait_for(site.fetch_page_window(page_url), 5)
+        self.assertEqual(
+            [page.url for page in pages], list(map(page_url, (1, 2, 3)))
+        )
+        self.assertEqual(
+            sorted(page for _, page in self.requests), list(range(1, 9))
+        )
+        self.assertFalse(
+            any(page_url(page) in site.requests for page in range(5, 9))
+        )
+
+    async def test_find_last_page(self) -> None:
+        last_page: int = 0
+
+        async def handler(request: web.Request, page: int) -> web.Response:
+            if page > last_page:
+                raise web.HTTPNotFound()
+            return web.Response(text=f"<p>page {page}</p>")
+
+        site, page_url = await self.start_site(handler)
+        for last_page in (1, 2, 5, 16, 17, 100):
+            with self.subTest(last_page=last_page):
+                self.requests.clear()
+                self.assertEqual(
+                    await site.find_last_page(page_url), last_page
+                )
+                self.assertLess(len(self.requests), 20)
+        last_page = 0
+        self.assertIsNone(await site.find_last_page(page_url))
+
+    async def test_find_last_page_stops_at_max_pages(self) -> None:
+        async def handler(request: web.Request, page: int) -> web.Response:
+            return web.Response(text=f"<p>page {page}</p>")
+
+        site, page_url = await self.start_site(handler, MaxPages=50)
+        self.assertEqual(await site.find_last_page(page_url), 50)
+
+    async def test_find_last_page_fails_on_blocked_probes(self) -> None:
+        async def handler(request: web.Request, page: int) -> web.Response:
+            if request.method == "HEAD":
+                raise web.HTTPForbidden()
+            if page > 3:
+                raise web.HTTPNotFound()
+            return web.Response(text=f"<p>page {page}</p>")
+
+        site, page_url = await self.start_site(handler, ProbeLastPage=True)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await site.find_last_page(page_url)
+        pages = await site.fetch_pages(page_url)
+        self.assertEqual(
+            [page.url for page in pages], list(map(page_url, (1, 2, 3)))
+        )
+
+    async def test_retry_after(self) -> None:
+        async def handler(request: web.Request, page: int) -> web.Response:
+            if len(self.requests) == 1:
+                raise web.HTTPTooManyRequests(headers={"Retry-After": "0"})
+            return web.Response(text=f"<p>page {page}</p>")
+
+        # the backoff is too long for the test, Retry-After must be used
+        site, page_url = await self.start_site(handler, RetryBackoff=60)
+        page = await asyncio.wait_for(site.request_page(page_url(1)), 5)
+        self.assertEqual(page.status, 200)
+        self.assertEqual(self.requests, [("GET", 1), ("GET", 1)])
+
+
+class EventLoopTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        base_site.set_max_concurrency(base_site.DefaultMaxConcurrency)
+
+    def test_shared_objects_follow_the_running_loop(self) -> None:
+        base_site.set_max_concurrency(1)
+
+        async def use_shared_objects():
+            async def request() -> None:
+                async with base_site.requests_semaphore():
+                    await asyncio.sleep(0)
+
+            # the second request waits for the semaphore
+            await asyncio.gather(request(), request())
+            return await base_site.get_session()
+
+        first_session = asyncio.run(use_shared_objects())
+        second_session = asyncio.run(use_shared_objects())
+        self.assertIsNot(first_session, second_session)
+        asyncio.run(first_session.close())
+        asyncio.run(second_session.close())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for martyr_search_tool.sites.twitter"""
+
+import unittest
+from types import SimpleNamespace
+
+from martyr_search_tool.sites.twitter import Twitter, batch_query
+
+
+def tweet(tweet_id: str, text: str) -> SimpleNamespace:
+    """Create a stand-in for a twikit.Tweet"""
+    return SimpleNamespace(
+        id=tweet_id, text=text, user=SimpleNamespace(name="user")
+    )
+
+
+def link(tweet_id: str) -> str:
+    return f"https://twitter.com/user/status/{tweet_id}"
+
+
+class QueryBatchesTest(unittest.TestCase):
+    def test_names_per_query(self) -> None:
+        names = [f"Name {index}" for index in range(25)]
+        batches = Twitter.query_batches(names + names[:5])
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual([name for batch in batches for name in batch], names)
+
+    def test_max_query_length(self) -> None:
+        names = ["a" * 200, "b" * 200, "c" * 200, "d" * 600]
+        batches = Twitter.query_batches(names)
+        self.assertEqual(
+            batches, [("a" * 200, "b" * 200), ("c" * 200,), ("d" * 600,)]
+        )
+        for batch in batches[:2]:
+            self.assertLessEqual(
+                len(batch_query(batch)), Twitter.MaxQueryLength
+            )
+
+
+class SearchTweetsTest(unittest.TestCase):
+    def test_batch_attribution(self) -> None:
+        names = ["Lian Hussein", "Omar", "Ali"]
+        both = tweet("1", "Lian Hussein and Omar")
+        omar = tweet("2", "only omar here")
+        unrelated = tweet("3", "no names in this tweet")
+        results = Twitter.search_tweets(
+            names, {("Lian Hussein", "Omar", "Ali"): [both, omar, unrelated]}
+        )
+        self.assertEqual(
+            [(result.name, result.url) for result in results],
+            [
+                ("Lian Hussein", link("1")),
+                ("Omar", link("1")),
+                ("Omar", link("2")),
+            ],
+        )
+
+    def test_single_name_attribution(self) -> None:
+        names = ["Lian Hussein", "Omar"]
+        both = tweet("1", "Lian Hussein and Omar")
+        unmentioned = tweet("2", "twitter matched this tweet")
+        results = Twitter.search_tweets(
+            names,
+            {
+                ("Lian Hussein",): [both, tweet("3", "no names")],
+                ("Omar",): [both, unmentioned],
+            },
+        )
+        self.assertEqual(
+            [(result.name, result.url) for result in results],
+            [
+                ("Lian Hussein", link("1")),
+                ("Lian Hussein", link("3")),
+                ("Omar", link("1")),
+                ("Omar", link("2")),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()